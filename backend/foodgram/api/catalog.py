@@ -0,0 +1,70 @@
+import gzip
+import threading
+
+from rest_framework.renderers import JSONRenderer
+
+from recipes.catalog import get_catalog_version
+from recipes.models import Ingredient
+from .serializers import IngredientSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('identity', 'gzip') if brotli is None else (
+    'identity', 'gzip', 'br'
+)
+
+
+def choose_encoding(request, available=ENCODINGS):
+    """Лучшее из доступных сжатий, принимаемых клиентом."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00'):
+            continue
+        accepted.add(coding.strip().lower())
+    for encoding in ('br', 'gzip'):
+        if encoding in available and encoding in accepted:
+            return encoding
+    return 'identity'
+
+
+class CatalogBlob:
+    """Отрендеренный JSON справочника и его сжатые варианты."""
+    def __init__(self, version, content):
+        self.version = version
+        self.variants = {
+            'identity': content,
+            'gzip': gzip.compress(content, compresslevel=9),
+        }
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(content)
+
+
+class IngredientCatalog:
+    """
+    Полный список ингредиентов, отрендеренный один раз на версию
+    справочников и хранящийся в памяти процесса.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blob = None
+
+    def _build(self, version):
+        data = IngredientSerializer(Ingredient.objects.all(), many=True).data
+        return CatalogBlob(version, JSONRenderer().render(data))
+
+    def get(self):
+        version = get_catalog_version()
+        blob = self._blob
+        if blob is None or blob.version != version:
+            with self._lock:
+                blob = self._blob
+                if blob is None or blob.version != version:
+                    blob = self._blob = self._build(version)
+        return blob
+
+
+ingredient_catalog = IngredientCatalog()
@@ -1,7 +1,10 @@
-from rest_framework.filters import SearchFilter
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
 from django_filters.rest_framework import (ModelMultipleChoiceFilter,
                                            FilterSet, BooleanFilter,
-                                           NumberFilter)
+                                           NumberFilter, CharFilter,
+                                           IsoDateTimeFilter)
 
 from recipes.models import Recipe, Tag
 
@@ -14,10 +17,14 @@ class RecipeFilter(FilterSet):
                                      queryset=Tag.objects.all())
     is_favorited = BooleanFilter(method='filter_is_favorited')
     is_in_shopping_cart = BooleanFilter(method='filter_is_in_shopping_cart')
+    search = CharFilter(method='filter_search')
+    modified_since = IsoDateTimeFilter(field_name='updated_at',
+                                       lookup_expr='gte')
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'is_favorited', 'author', 'is_in_shopping_cart')
+        fields = ('tags', 'is_favorited', 'author', 'is_in_shopping_cart',
+                  'search', 'modified_since')
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
@@ -31,6 +38,18 @@ class RecipeFilter(FilterSet):
         else:
             return queryset
 
-
-class IngredientFilter(SearchFilter):
-    search_param = 'name'
+    def filter_search(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по названию и описанию рецепта.
+
+        В Postgres используется tsvector с GIN-индексом и ранжированием,
+        в остальных СУБД — поиск подстроки.
+        """
+        if connections[queryset.db].vendor != 'postgresql':
+            return queryset.filter(
+                Q(name__icontains=value) | Q(text__icontains=value)
+            )
+        query = SearchQuery(value, config='russian', search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-id')
@@ -0,0 +1,94 @@
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+
+class MetricsRegistry:
+    """
+    Гистограммы задержек и числа запросов к базе по вьюхам.
+
+    Метрики собираются в памяти процесса, каждый воркер отдаёт свои.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, method, duration, timing):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = ViewMetrics()
+            metrics.duration.observe(duration)
+            metrics.queries.observe(timing.sql_count)
+            metrics.sql_seconds += timing.sql_time
+            metrics.serializer_seconds += timing.serializer_time
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = []
+            for name, help_text, attr in (
+                ('foodgram_request_duration_seconds',
+                 'Время обработки запроса.', 'duration'),
+                ('foodgram_request_sql_queries',
+                 'Количество SQL-запросов на запрос.', 'queries'),
+            ):
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} histogram']
+                for (view, method), metrics in views:
+                    histogram = getattr(metrics, attr)
+                    labels = f'view="{view}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(
+                        (*histogram.buckets, '+Inf'), histogram.counts
+                    ):
+                        cumulative += count
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} '
+                            f'{cumulative}'
+                        )
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(
+                        f'{name}_count{{{labels}}} {histogram.count}'
+                    )
+            for name, help_text, attr in (
+                ('foodgram_sql_seconds_total',
+                 'Суммарное время SQL-запросов.', 'sql_seconds'),
+                ('foodgram_serializer_seconds_total',
+                 'Суммарное время сериализации.', 'serializer_seconds'),
+            ):
+                lines += [f'# HELP {name} {help_text}',
+                          f'# TYPE {name} counter']
+                for (view, method), metrics in views:
+                    lines.append(
+                        f'{name}{{view="{view}",method="{method}"}} '
+                        f'{getattr(metrics, attr)}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
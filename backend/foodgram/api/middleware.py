@@ -0,0 +1,38 @@
+import time
+
+from django.db import connection
+
+from foodgram.metrics import RequestTiming, current_timing
+
+from .metrics import registry
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет время запроса, число и время SQL-запросов и время
+    сериализации. Отдаёт их в заголовке Server-Timing и копит
+    в гистограммах для /api/metrics/.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(timing.sql_wrapper):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        duration = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        registry.record(view, request.method, duration, timing)
+        response['Server-Timing'] = (
+            f'total;dur={duration * 1000:.1f}, '
+            f'db;dur={timing.sql_time * 1000:.1f};'
+            f'desc="{timing.sql_count} queries", '
+            f'serializer;dur={timing.serializer_time * 1000:.1f}'
+        )
+        return response
@@ -0,0 +1,150 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework.response import Response
+
+from recipes.catalog import (get_catalog_version, get_version,
+                             version_time, viewer_version_key)
+
+
+class CatalogConditionalMixin:
+    """
+    Условные GET-запросы для справочников.
+
+    ETag строится из версии справочников, поэтому запрос с совпадающим
+    If-None-Match получает 304 без обращения к базе и сериализатору.
+    """
+    def get_etag(self, request):
+        return get_catalog_version()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = quote_etag(self.get_etag(request))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(
+                response, public=True, must_revalidate=True,
+                max_age=settings.CATALOG_CACHE_MAX_AGE
+            )
+            patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Кэш ответов list и retrieve для анонимных пользователей.
+
+    Запись хранится вместе с версией данных (response_cache_version_key)
+    и считается действительной, пока версия не изменилась. Версия и
+    запись читаются одним get_many, так что попадание в кэш не требует
+    запросов к базе.
+    """
+    response_cache_version_key = None
+    response_cache_prefix = 'api:response:'
+
+    def response_cache_key(self, request):
+        # Пустые параметры тоже значимы: ?cursor= включает пагинацию
+        # по курсору с другим форматом ответа.
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        )
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self.response_cache_prefix + hashlib.md5(
+            f'{request.build_absolute_uri("/")}:{self.basename}:'
+            f'{self.action}:{lookup}:{urlencode(params)}'.encode()
+        ).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        version_key = self.response_cache_version_key
+        key = self.response_cache_key(request)
+        cached = cache.get_many((version_key, key))
+        version, entry = cached.get(version_key), cached.get(key)
+        if version is not None and entry is not None and entry[0] == version:
+            return Response(entry[1])
+        version = version or get_version(version_key)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key, (version, response.data),
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class VersionedConditionalMixin:
+    """
+    Условные GET для list и retrieve.
+
+    ETag и Last-Modified строятся из версии данных
+    (conditional_version_key) и версии отметок текущего пользователя,
+    которые хранятся в кэше, поэтому ответ 304 не требует запросов
+    к базе. Версии меняются при любом изменении, включая удаление,
+    а Last-Modified равен моменту последнего из них, округлённому
+    вверх до секунды.
+
+    HTTP-даты точны до секунды, а If-Modified-Since сравнивается
+    строго, поэтому Last-Modified отдаётся только после того, как эта
+    секунда прошла: иначе изменение в ту же секунду осталось бы
+    незамеченным.
+    """
+    conditional_version_key = None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        keys = [self.conditional_version_key]
+        if request.user.is_authenticated:
+            keys.append(viewer_version_key(request.user.pk))
+        cached = cache.get_many(keys)
+        versions = [cached.get(key) or get_version(key) for key in keys]
+        etag = quote_etag(hashlib.md5(
+            ' '.join((*versions, request.build_absolute_uri())).encode()
+        ).hexdigest())
+        last_modified = math.ceil(max(
+            version_time(version) or time.time() for version in versions
+        ))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if time.time() >= last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, no_cache=True)
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
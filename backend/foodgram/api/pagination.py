@@ -1,6 +1,176 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+# Стратегии подсчёта возвращают пару (количество, точное ли оно).
+
+
+def exact_count(queryset):
+    """Точное количество объектов через COUNT(*)."""
+    return queryset.count(), True
+
+
+def capped_count(queryset):
+    """
+    Количество объектов, ограниченное PAGINATION_COUNT_CAP: если
+    объектов больше, возвращается сам предел как неточное значение.
+    """
+    cap = settings.PAGINATION_COUNT_CAP
+    count = queryset.order_by()[:cap + 1].count()
+    return min(count, cap), count <= cap
+
+
+def estimated_count(queryset):
+    """
+    Оценка количества объектов планировщиком Postgres.
+
+    Небольшие выборки и другие СУБД считаются точно.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return exact_count(queryset)
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < settings.PAGINATION_COUNT_CAP:
+        return exact_count(queryset)
+    return estimate, False
+
+
+COUNT_STRATEGIES = {
+    'exact': exact_count,
+    'capped': capped_count,
+    'estimate': estimated_count,
+}
+
+
+class LookAheadPage(Page):
+    """Страница, о следующей странице которой известно по лишнему объекту."""
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    Пагинатор с заменяемой стратегией подсчёта объектов.
+
+    Если количество неточное (ограничено или оценено), число страниц
+    не проверяется: страница выбирается с одним лишним объектом,
+    по которому и определяется, есть ли следующая.
+    """
+    def __init__(self, *args, count_strategy=exact_count, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy
+
+    @cached_property
+    def counted(self):
+        if hasattr(self.object_list, 'query'):
+            return self.count_strategy(self.object_list)
+        return len(self.object_list), True
+
+    @property
+    def count(self):
+        return self.counted[0]
+
+    @property
+    def count_is_exact(self):
+        return self.counted[1]
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return LookAheadPage(
+            objects[:self.per_page], number, self,
+            has_more=len(objects) > self.per_page
+        )
 
 
 class CustomPagination(PageNumberPagination):
+    """
+    Постраничная пагинация page/limit.
+
+    При стратегии подсчёта, отличной от exact, ответ содержит
+    count_is_exact: false означает, что count — предел или оценка
+    (например, «1000+»), а не точное количество.
+    """
     page_query_param = 'page'
     page_size_query_param = 'limit'
+
+    def django_paginator_class(self, queryset, page_size):
+        return CountStrategyPaginator(
+            queryset, page_size,
+            count_strategy=COUNT_STRATEGIES[
+                settings.PAGINATION_COUNT_STRATEGY
+            ]
+        )
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        if settings.PAGINATION_COUNT_STRATEGY == 'exact':
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_exact', paginator.count_is_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class KeysetPagination(CursorPagination):
+    """Пагинация по курсору без COUNT(*) и OFFSET."""
+    ordering = '-id'
+    page_size_query_param = 'limit'
+
+
+class RecipePagination(CustomPagination):
+    """
+    Постраничная пагинация с переходом на курсор.
+
+    Если в запросе передан параметр cursor (на первой странице пустой),
+    используется KeysetPagination, иначе — page/limit.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
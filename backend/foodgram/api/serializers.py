@@ -1,15 +1,25 @@
 import base64
 
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.db import transaction
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
 from recipes.models import (Recipe, RecipeIngredient,
                             Ingredient, Tag, Follow, Favorite,
-                            ShoppingCart)
+                            ShoppingCart, ShoppingListItem)
 from users.models import User
 from users.serializers import ProfileSerializer
-from recipes.constants import MIN_NUMBER
+from users.viewer import get_viewer_state
+from foodgram.metrics import TimedSerializerMixin
+from recipes.catalog import (CATALOG_VERSION_KEY, author_version_key,
+                             get_catalog_version, get_version)
+from recipes.constants import BATCH_MAX_SIZE, MIN_NUMBER
+from recipes.images import variant_urls
+from recipes.shopping_list import (recipe_amounts,
+                                   update_recipe_in_shopping_lists)
 
 
 class Base64ImageField(serializers.ImageField):
@@ -22,7 +32,29 @@ class Base64ImageField(serializers.ImageField):
         return super().to_internal_value(data)
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class ImageVariantsField(serializers.Field):
+    """Ссылки на уменьшенные копии изображения рецепта."""
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        urls = variant_urls(value.name, value.storage)
+        if request is None:
+            return urls
+        return {
+            variant: {
+                extension: request.build_absolute_uri(url)
+                for extension, url in formats.items()
+            }
+            for variant, formats in urls.items()
+        }
+
+
+class IngredientSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для ингредиентов."""
     class Meta:
         model = Ingredient
@@ -57,14 +89,92 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
         )
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для тэгов."""
     class Meta:
         model = Tag
         fields = ('id', 'name', 'color', 'slug')
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
+class RecipeFragmentListSerializer(TimedSerializerMixin,
+                                   serializers.ListSerializer):
+    """
+    Список рецептов, собранный из кэша фрагментов.
+
+    Не зависящее от пользователя представление рецепта кэшируется по id
+    вместе с собственной версией: временем изменения рецепта, версией
+    справочников и версией профиля автора. Фрагменты страницы и версии
+    читаются одним get_many. Рендерятся только отсутствующие или
+    устаревшие фрагменты, а флаги избранного, корзины и подписки
+    проставляются поверх них для текущего пользователя.
+    """
+    cache_prefix = 'recipes:fragment:'
+
+    def to_representation(self, data):
+        request = self.context['request']
+        prefix = f'{self.cache_prefix}{request.build_absolute_uri("/")}:'
+        keys = {recipe.id: f'{prefix}{recipe.id}' for recipe in data}
+        author_keys = {recipe.author_id: author_version_key(recipe.author_id)
+                       for recipe in data}
+        cached = cache.get_many(
+            [CATALOG_VERSION_KEY, *author_keys.values(), *keys.values()]
+        )
+        catalog_version = (cached.get(CATALOG_VERSION_KEY)
+                           or get_catalog_version())
+        versions = {
+            recipe.id: (
+                recipe.updated_at, catalog_version,
+                cached.get(author_keys[recipe.author_id])
+                or get_version(author_keys[recipe.author_id])
+            )
+            for recipe in data
+        }
+        fragments = {}
+        for recipe_id, key in keys.items():
+            entry = cached.get(key)
+            if entry is not None and entry[0] == versions[recipe_id]:
+                fragments[recipe_id] = entry[1]
+        missing = [recipe_id for recipe_id in keys
+                   if recipe_id not in fragments]
+        if missing:
+            rendered = self.render_fragments(missing)
+            cache.set_many(
+                {keys[recipe_id]: (versions[recipe_id], fragment)
+                 for recipe_id, fragment in rendered.items()},
+                settings.RESPONSE_CACHE_TIMEOUT
+            )
+            fragments.update(rendered)
+        state = get_viewer_state(request)
+        return [
+            self.personalize(fragments[recipe_id], state)
+            for recipe_id in keys if recipe_id in fragments
+        ]
+
+    def render_fragments(self, recipe_ids):
+        recipes = Recipe.objects.filter(
+            id__in=recipe_ids
+        ).with_related(AnonymousUser())
+        fragments = {}
+        for recipe in recipes:
+            fragment = self.child.to_representation(recipe)
+            fragment['is_favorited'] = False
+            fragment['is_in_shopping_cart'] = False
+            fragment['author']['is_subscribed'] = False
+            fragments[recipe.id] = fragment
+        return fragments
+
+    def personalize(self, fragment, state):
+        fragment['is_favorited'] = fragment['id'] in state.favorite_ids
+        fragment['is_in_shopping_cart'] = (
+            fragment['id'] in state.shopping_cart_ids
+        )
+        fragment['author']['is_subscribed'] = (
+            fragment['author']['id'] in state.following_ids
+        )
+        return fragment
+
+
+class RecipeListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для списка рецептов."""
     ingredients = IngredientAmountSerializer(source='recipeingredient_set',
                                              many=True)
@@ -77,24 +187,32 @@ class RecipeListSerializer(serializers.ModelSerializer):
     )
     author = ProfileSerializer(read_only=True)
     image = Base64ImageField()
+    image_variants = ImageVariantsField(source='image')
 
     class Meta:
         model = Recipe
         fields = (
-            'id', 'ingredients', 'tags', 'author', 'image', 'name',
-            'text', 'cooking_time', 'is_favorited',
+            'id', 'ingredients', 'tags', 'author', 'image', 'image_variants',
+            'name', 'text', 'cooking_time', 'is_favorited',
             'is_in_shopping_cart'
         )
+        list_serializer_class = RecipeFragmentListSerializer
 
     def get_is_favorited(self, obj):
         request = self.context.get('request')
-        return request.user.is_authenticated and obj.favorited.filter(
-            user=request.user).exists()
+        if not request.user.is_authenticated:
+            return False
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
+        return obj.id in get_viewer_state(request).favorite_ids
 
     def get_is_in_shopping_cart(self, obj):
         request = self.context.get('request')
-        return request.user.is_authenticated and obj.in_shopping_cart.filter(
-            user=request.user).exists()
+        if not request.user.is_authenticated:
+            return False
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
+        return obj.id in get_viewer_state(request).shopping_cart_ids
 
 
 class RecipeSerializer(serializers.ModelSerializer):
@@ -169,8 +287,10 @@ class RecipeSerializer(serializers.ModelSerializer):
                 {'error':
                  'Теги и ингредиенты необходимы для обновления рецепта'}
             )
+        old_amounts = recipe_amounts(instance.id)
         RecipeIngredient.objects.filter(recipe=instance).delete()
         self.bulk_ingredients(ingredients_data, instance)
+        update_recipe_in_shopping_lists(instance.id, old_amounts)
         if tags_data:
             instance.tags.set(tags_data)
 
@@ -180,19 +300,37 @@ class RecipeSerializer(serializers.ModelSerializer):
         return RecipeListSerializer(instance, context=self.context).data
 
 
-class FollowFavoriteRecipeSerializer(serializers.ModelSerializer):
+class FollowFavoriteRecipeSerializer(TimedSerializerMixin,
+                                     serializers.ModelSerializer):
     """Вложенный сериализатор для списка подписок/избранного."""
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = Recipe
         fields = (
-            'id', 'name', 'image', 'cooking_time'
+            'id', 'name', 'image', 'image_variants', 'cooking_time'
         )
 
 
-class FollowListSerializer(serializers.ModelSerializer):
+def attach_latest_recipes(authors, request):
+    """
+    Загружает последние рецепты для всех авторов страницы одним
+    запросом с учётом параметра recipes_limit.
+    """
+    limit = request.GET.get('recipes_limit')
+    limit = int(limit) if limit and limit.isdigit() else None
+    latest_recipes = {author.id: [] for author in authors}
+    for recipe in Recipe.objects.latest_per_author(latest_recipes, limit):
+        latest_recipes[recipe.author_id].append(recipe)
+    for author in authors:
+        author.latest_recipes = latest_recipes[author.id]
+    return authors
+
+
+class FollowListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для списка подписок."""
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.ReadOnlyField(source='recipes.count')
+    recipes_count = serializers.ReadOnlyField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -203,21 +341,16 @@ class FollowListSerializer(serializers.ModelSerializer):
         )
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipes = Recipe.objects.filter(author=obj)
-        if limit:
-            recipes = recipes[:int(limit)]
+        if not hasattr(obj, 'latest_recipes'):
+            attach_latest_recipes([obj], self.context.get('request'))
         return FollowFavoriteRecipeSerializer(
-            recipes, many=True, context=self.context
+            obj.latest_recipes, many=True, context=self.context
         ).data
 
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return Follow.objects.filter(
-                user=request.user, following=obj
-            ).exists()
+            return obj.id in get_viewer_state(request).following_ids
         return False
 
 
@@ -235,13 +368,6 @@ class FollowSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Нельзя подписаться на самого себя!'
             )
-        if Follow.objects.filter(
-            user=self.context['request'].user,
-            following=data['following']
-        ).exists():
-            raise serializers.ValidationError(
-                'Вы уже подписаны на данного автора!'
-            )
         return data
 
     def to_representation(self, instance):
@@ -250,6 +376,14 @@ class FollowSerializer(serializers.ModelSerializer):
         ).data
 
 
+class IdListSerializer(serializers.Serializer):
+    """Список id для массовых операций."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=BATCH_MAX_SIZE
+    )
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     """Сериализатор для избранного."""
     class Meta:
@@ -272,3 +406,18 @@ class ShoppingCartSerializer(serializers.ModelSerializer):
         return FollowFavoriteRecipeSerializer(
             instance.recipe, context=self.context
         ).data
+
+
+class ShoppingListItemSerializer(TimedSerializerMixin,
+                                 serializers.ModelSerializer):
+    """Сериализатор для просмотра списка покупок."""
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+    amount = serializers.IntegerField(source='total_amount', read_only=True)
+
+    class Meta:
+        model = ShoppingListItem
+        fields = ('id', 'name', 'measurement_unit', 'amount')
@@ -0,0 +1,46 @@
+import csv
+import json
+
+
+class Echo:
+    """Псевдо-буфер для csv.writer, возвращающий записанную строку."""
+    def write(self, value):
+        return value
+
+
+def txt_lines(items):
+    yield 'Shopping Cart\n'
+    for item in items:
+        yield (f"{item['ingredient__name']} "
+               f"({item['ingredient__measurement_unit']}) - "
+               f"{item['amount_sum']}\n")
+
+
+def csv_lines(items):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for item in items:
+        yield writer.writerow((
+            item['ingredient__name'],
+            item['ingredient__measurement_unit'],
+            item['amount_sum'],
+        ))
+
+
+def json_lines(items):
+    separator = '['
+    for item in items:
+        yield separator + json.dumps({
+            'name': item['ingredient__name'],
+            'measurement_unit': item['ingredient__measurement_unit'],
+            'amount': item['amount_sum'],
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']' if separator == ',' else '[]'
+
+
+SHOPPING_CART_FORMATS = {
+    'txt': txt_lines,
+    'csv': csv_lines,
+    'json': json_lines,
+}
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient, APITestCase
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import User
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class FoodgramAPITestCase(APITestCase):
+    """Базовый класс тестов API с чистым кэшем в памяти процесса."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls.create_user('user')
+        cls.author = cls.create_user('author')
+        cls.tag = Tag.objects.create(name='Обед', color='#00ff00',
+                                     slug='lunch')
+        cls.ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('Мука', 'Сахар', 'Соль')
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def create_user(username):
+        return User.objects.create_user(
+            email=f'{username}@example.com', username=username,
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+
+    @classmethod
+    def create_recipe(cls, author=None, name='Рецепт', amounts=(100,)):
+        recipe = Recipe.objects.create(
+            author=author or cls.author, name=name, text='Текст',
+            cooking_time=10, image='image/recipe.jpg'
+        )
+        recipe.tags.add(cls.tag)
+        for ingredient, amount in zip(cls.ingredients, amounts):
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+        return recipe
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import http_date
+
+from recipes.catalog import RECIPES_VERSION_KEY
+from recipes.models import Recipe
+from .base import FoodgramAPITestCase
+
+RECIPES_URL = '/api/recipes/'
+
+
+class RecipeConditionalGetTest(FoodgramAPITestCase):
+    """ETag, Last-Modified и фильтр modified_since для рецептов."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipes = [cls.create_recipe(name=f'Рецепт {index}')
+                       for index in range(2)]
+
+    def test_matching_etag_returns_304_without_queries(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_change_updates_etag(self):
+        etag = self.client.get(RECIPES_URL)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[0].delete()
+        response = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_viewer_marks_update_only_own_etag(self):
+        client = self.client_for(self.user)
+        etag = client.get(RECIPES_URL)['ETag']
+        anonymous_etag = self.client.get(RECIPES_URL)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'{RECIPES_URL}{self.recipes[0].id}/favorite/')
+        self.assertEqual(
+            client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+        self.assertEqual(self.client.get(
+            RECIPES_URL, HTTP_IF_NONE_MATCH=anonymous_etag
+        ).status_code, 304)
+
+    def test_last_modified_is_version_time(self):
+        cache.set(RECIPES_VERSION_KEY, '1000.000000:version', None)
+        response = self.client.get(RECIPES_URL)
+        self.assertEqual(response['Last-Modified'], http_date(1000))
+        self.assertEqual(self.client.get(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=http_date(1000)
+        ).status_code, 304)
+        self.assertEqual(self.client.get(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=http_date(999)
+        ).status_code, 200)
+
+    def test_modified_since_filter(self):
+        since = timezone.now() + timedelta(minutes=1)
+        Recipe.objects.filter(pk=self.recipes[1].pk).update(
+            updated_at=since + timedelta(minutes=1)
+        )
+        response = self.client.get(
+            RECIPES_URL, {'modified_since': since.isoformat()}
+        )
+        self.assertEqual(
+            [item['id'] for item in response.json()['results']],
+            [self.recipes[1].id]
+        )
+
+
+class CatalogConditionalGetTest(FoodgramAPITestCase):
+    """ETag справочников меняется вместе с их версией."""
+    def test_tags_etag(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        self.assertEqual(self.client.get(
+            '/api/tags/', HTTP_IF_NONE_MATCH=etag
+        ).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'Ужин'
+            self.tag.save()
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['name'], 'Ужин')
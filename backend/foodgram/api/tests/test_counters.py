@@ -0,0 +1,31 @@
+from recipes.models import Recipe
+from users.models import User
+from .base import FoodgramAPITestCase
+
+
+class CountersSaveTest(FoodgramAPITestCase):
+    """Сохранение загруженного ранее объекта не затирает счётчики."""
+    def test_stale_recipe_save_keeps_counters(self):
+        recipe = self.create_recipe()
+        stale = Recipe.objects.get(pk=recipe.pk)
+        self.client_for(self.user).post(f'/api/recipes/{recipe.id}/favorite/')
+        stale.name = 'Новое название'
+        stale.save()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.name, 'Новое название')
+        self.assertEqual(recipe.favorites_count, 1)
+
+    def test_password_change_keeps_followers_count(self):
+        stale = User.objects.get(pk=self.author.pk)
+        self.client_for(self.user).post(
+            f'/api/users/{self.author.id}/subscribe/'
+        )
+        response = self.client_for(stale).post(
+            '/api/users/set_password/',
+            {'current_password': 'password', 'new_password': 'Pa55word!x'}
+        )
+        self.assertEqual(response.status_code, 204)
+        author = User.objects.get(pk=self.author.pk)
+        self.assertTrue(author.check_password('Pa55word!x'))
+        self.assertEqual(author.followers_count, 1)
+        self.assertEqual(author.recipes_count, 0)
@@ -0,0 +1,43 @@
+from django.test import override_settings
+
+from recipes.models import Follow
+from .base import FoodgramAPITestCase
+
+FEED_URL = '/api/recipes/feed/'
+
+
+@override_settings(FEED_CACHE_TIMEOUT=60)
+class FeedCacheTest(FoodgramAPITestCase):
+    """Кэш страниц ленты сбрасывается при изменении рецептов и подписок."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipe = cls.create_recipe(name='Пирог')
+        Follow.objects.create(user=cls.user, following=cls.author)
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.user)
+
+    def feed_names(self):
+        return [item['name']
+                for item in self.client.get(FEED_URL).json()['results']]
+
+    def test_recipe_change_resets_feed(self):
+        self.assertEqual(self.feed_names(), ['Пирог'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.name = 'Новый пирог'
+            self.recipe.save()
+        self.assertEqual(self.feed_names(), ['Новый пирог'])
+
+    def test_new_recipe_appears_in_feed(self):
+        self.feed_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_recipe(name='Суп')
+        self.assertEqual(self.feed_names(), ['Суп', 'Пирог'])
+
+    def test_unsubscribe_resets_feed(self):
+        self.feed_names()
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.filter(user=self.user).delete()
+        self.assertEqual(self.feed_names(), [])
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from api.serializers import RecipeFragmentListSerializer
+from recipes.models import RecipeIngredient
+from .base import FoodgramAPITestCase
+
+
+class RecipeFragmentCacheTest(FoodgramAPITestCase):
+    """Фрагменты рецептов устаревают по отдельности."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other_author = cls.create_user('other')
+        cls.recipe = cls.create_recipe(name='Пирог')
+        cls.other_recipe = cls.create_recipe(author=cls.other_author,
+                                             name='Суп')
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.user)
+
+    def get_rendered(self):
+        """Список рецептов и id фрагментов, собранных заново."""
+        render = RecipeFragmentListSerializer.render_fragments
+        with mock.patch.object(RecipeFragmentListSerializer,
+                               'render_fragments', autospec=True,
+                               side_effect=render) as patched:
+            response = self.client.get('/api/recipes/')
+        rendered = {recipe_id for call in patched.call_args_list
+                    for recipe_id in call.args[1]}
+        results = {item['id']: item for item in response.json()['results']}
+        return results, rendered
+
+    def test_unchanged_fragments_are_reused(self):
+        self.get_rendered()
+        _, rendered = self.get_rendered()
+        self.assertEqual(rendered, set())
+
+    def test_recipe_change_renders_only_that_recipe(self):
+        self.get_rendered()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe.name = 'Новый пирог'
+            self.recipe.save()
+        results, rendered = self.get_rendered()
+        self.assertEqual(rendered, {self.recipe.id})
+        self.assertEqual(results[self.recipe.id]['name'], 'Новый пирог')
+
+    def test_ingredient_row_change_renders_its_recipe(self):
+        self.get_rendered()
+        row = RecipeIngredient.objects.get(recipe=self.recipe)
+        row.amount = 250
+        row.save()
+        results, rendered = self.get_rendered()
+        self.assertEqual(rendered, {self.recipe.id})
+        self.assertEqual(
+            results[self.recipe.id]['ingredients'][0]['amount'], 250
+        )
+
+    def test_tag_change_renders_its_recipe(self):
+        self.get_rendered()
+        self.other_recipe.tags.clear()
+        results, rendered = self.get_rendered()
+        self.assertEqual(rendered, {self.other_recipe.id})
+        self.assertEqual(results[self.other_recipe.id]['tags'], [])
+
+    def test_author_change_renders_author_recipes(self):
+        self.get_rendered()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_author.first_name = 'Новое имя'
+            self.other_author.save()
+        results, rendered = self.get_rendered()
+        self.assertEqual(rendered, {self.other_recipe.id})
+        self.assertEqual(
+            results[self.other_recipe.id]['author']['first_name'],
+            'Новое имя'
+        )
@@ -0,0 +1,64 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.test import override_settings
+
+from .base import FoodgramAPITestCase
+
+
+class RecipePaginationTest(FoodgramAPITestCase):
+    """Постраничная пагинация, курсор и стратегии подсчёта."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipe_ids = sorted(
+            (cls.create_recipe(name=f'Рецепт {index}').id
+             for index in range(30)),
+            reverse=True
+        )
+
+    def get_page(self, page, limit=6):
+        return self.client.get('/api/recipes/', {'page': page,
+                                                 'limit': limit})
+
+    def test_exact_count(self):
+        data = self.get_page(5).json()
+        self.assertEqual(data['count'], 30)
+        self.assertNotIn('count_is_exact', data)
+        self.assertIsNone(data['next'])
+        self.assertEqual(self.get_page(6).status_code, 404)
+
+    @override_settings(PAGINATION_COUNT_STRATEGY='capped',
+                       PAGINATION_COUNT_CAP=10)
+    def test_capped_count_pages_past_cap(self):
+        ids = []
+        for page in range(1, 6):
+            response = self.get_page(page)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(data['count'], 10)
+            self.assertIs(data['count_is_exact'], False)
+            self.assertEqual(data['next'] is None, page == 5)
+            ids += [recipe['id'] for recipe in data['results']]
+        self.assertEqual(ids, self.recipe_ids)
+        self.assertEqual(self.get_page(6).status_code, 404)
+
+    @override_settings(PAGINATION_COUNT_STRATEGY='capped',
+                       PAGINATION_COUNT_CAP=100)
+    def test_capped_count_below_cap_is_exact(self):
+        data = self.get_page(1).json()
+        self.assertEqual(data['count'], 30)
+        self.assertIs(data['count_is_exact'], True)
+
+    def test_cursor_pagination(self):
+        ids = []
+        params = {'cursor': '', 'limit': 7}
+        while True:
+            response = self.client.get('/api/recipes/', params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('count', data)
+            ids += [recipe['id'] for recipe in data['results']]
+            if data['next'] is None:
+                break
+            params = parse_qs(urlparse(data['next']).query)
+        self.assertEqual(ids, self.recipe_ids)
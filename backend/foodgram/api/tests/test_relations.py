@@ -0,0 +1,113 @@
+from recipes.models import (Favorite, Follow, Recipe, ShoppingCart,
+                            ShoppingListItem)
+from recipes.shopping_list import expected_totals, stored_totals
+from users.models import User
+from .base import FoodgramAPITestCase
+
+
+class RelationsTest(FoodgramAPITestCase):
+    """Идемпотентные и массовые операции с избранным, корзиной и подписками."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipes = [
+            cls.create_recipe(name=f'Рецепт {index}', amounts=(100, 5))
+            for index in range(3)
+        ]
+        cls.recipe_ids = [recipe.id for recipe in cls.recipes]
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.user)
+
+    def assert_totals_consistent(self):
+        self.assertEqual(stored_totals(), expected_totals())
+
+    def test_single_favorite_is_idempotent(self):
+        url = f'/api/recipes/{self.recipes[0].id}/favorite/'
+        for _ in range(2):
+            self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(Favorite.objects.filter(user=self.user).count(), 1)
+        self.recipes[0].refresh_from_db()
+        self.assertEqual(self.recipes[0].favorites_count, 1)
+        for _ in range(2):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.recipes[0].refresh_from_db()
+        self.assertEqual(self.recipes[0].favorites_count, 0)
+
+    def test_batch_shopping_cart(self):
+        url = '/api/recipes/shopping_cart/'
+        for _ in range(2):
+            response = self.client.post(url, {'ids': self.recipe_ids},
+                                        format='json')
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            ShoppingCart.objects.filter(user=self.user).count(), 3
+        )
+        self.assertEqual(
+            list(Recipe.objects.order_by('id')
+                 .values_list('in_carts_count', flat=True)),
+            [1, 1, 1]
+        )
+        self.assertEqual(
+            ShoppingListItem.objects.get(
+                user=self.user, ingredient=self.ingredients[0]
+            ).total_amount, 300
+        )
+        self.assert_totals_consistent()
+
+        response = self.client.delete(url, {'ids': self.recipe_ids[:2]},
+                                      format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            ShoppingListItem.objects.get(
+                user=self.user, ingredient=self.ingredients[0]
+            ).total_amount, 100
+        )
+        self.assert_totals_consistent()
+        response = self.client.delete(url, {'ids': self.recipe_ids},
+                                      format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(
+            ShoppingListItem.objects.filter(user=self.user).exists()
+        )
+        self.assertEqual(
+            list(Recipe.objects.order_by('id')
+                 .values_list('in_carts_count', flat=True)),
+            [0, 0, 0]
+        )
+
+    def test_batch_rejects_unknown_ids(self):
+        response = self.client.post(
+            '/api/recipes/favorite/', {'ids': [self.recipe_ids[0], 10 ** 6]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Favorite.objects.exists())
+
+    def test_batch_subscribe(self):
+        other = self.create_user('other')
+        url = '/api/users/subscribe/'
+        for _ in range(2):
+            response = self.client.post(
+                url, {'ids': [self.author.id, other.id]}, format='json'
+            )
+            self.assertEqual(response.status_code, 204)
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).followers_count, 1
+        )
+        response = self.client.post(url, {'ids': [self.user.id]},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(url, {'ids': [self.author.id]},
+                                      format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(
+            list(Follow.objects.filter(user=self.user)
+                 .values_list('following_id', flat=True)),
+            [other.id]
+        )
+        self.assertEqual(
+            User.objects.get(pk=self.author.pk).followers_count, 0
+        )
@@ -0,0 +1,49 @@
+from .base import FoodgramAPITestCase
+
+
+class AnonymousResponseCacheTest(FoodgramAPITestCase):
+    """Кэш ответов списка и карточки рецепта для анонимных пользователей."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipes = [cls.create_recipe(name=f'Рецепт {index}')
+                       for index in range(3)]
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get('/api/recipes/', {'limit': 2}).json()
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/recipes/', {'limit': 2})
+        self.assertEqual(response.json(), first)
+        recipe_id = self.recipes[0].id
+        self.client.get(f'/api/recipes/{recipe_id}/')
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/recipes/{recipe_id}/')
+        self.assertEqual(response.json()['id'], recipe_id)
+
+    def test_empty_cursor_has_its_own_entry(self):
+        cursor = self.client.get('/api/recipes/', {'cursor': '', 'limit': 2})
+        self.assertNotIn('count', cursor.json())
+        page = self.client.get('/api/recipes/', {'limit': 2}).json()
+        self.assertEqual(page['count'], 3)
+
+    def test_change_invalidates_cache(self):
+        self.client.get('/api/recipes/')
+        recipe = self.recipes[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.name = 'Новое название'
+            recipe.save()
+        names = [item['name']
+                 for item in self.client.get('/api/recipes/').json()[
+                     'results']]
+        self.assertIn('Новое название', names)
+
+    def test_authenticated_requests_are_not_cached(self):
+        client = self.client_for(self.user)
+        client.get('/api/recipes/')
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(f'/api/recipes/{self.recipes[0].id}/favorite/')
+        results = client.get('/api/recipes/').json()['results']
+        favorited = {item['id']: item['is_favorited'] for item in results}
+        self.assertIs(favorited[self.recipes[0].id], True)
+        anonymous = self.client.get('/api/recipes/').json()['results']
+        self.assertFalse(any(item['is_favorited'] for item in anonymous))
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+
+from .base import FoodgramAPITestCase
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingCartExportTest(FoodgramAPITestCase):
+    """Выгрузка списка покупок в txt, csv и json."""
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.recipes = [cls.create_recipe(amounts=(100, 5)),
+                       cls.create_recipe(amounts=(50,))]
+
+    def setUp(self):
+        super().setUp()
+        self.client = self.client_for(self.user)
+
+    def fill_cart(self):
+        self.client.post('/api/recipes/shopping_cart/',
+                         {'ids': [recipe.id for recipe in self.recipes]},
+                         format='json')
+
+    def download(self, **kwargs):
+        response = self.client.get(DOWNLOAD_URL, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_empty_cart(self):
+        self.assertEqual(self.client.get(DOWNLOAD_URL).status_code, 400)
+
+    def test_txt_is_default(self):
+        self.fill_cart()
+        response, content = self.download()
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; charset=utf-8')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="shopping_cart.txt"'
+        )
+        self.assertEqual(content, 'Shopping Cart\n'
+                                  'Мука (г) - 150\n'
+                                  'Сахар (г) - 5\n')
+
+    def test_csv(self):
+        self.fill_cart()
+        response, content = self.download(data={'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(list(csv.reader(io.StringIO(content))), [
+            ['name', 'measurement_unit', 'amount'],
+            ['Мука', 'г', '150'],
+            ['Сахар', 'г', '5'],
+        ])
+
+    def test_json_by_accept_header(self):
+        self.fill_cart()
+        response, content = self.download(HTTP_ACCEPT='application/json')
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="shopping_cart.json"'
+        )
+        self.assertEqual(json.loads(content), [
+            {'name': 'Мука', 'measurement_unit': 'г', 'amount': 150},
+            {'name': 'Сахар', 'measurement_unit': 'г', 'amount': 5},
+        ])
+
+    def test_unknown_format(self):
+        self.fill_cart()
+        response = self.client.get(DOWNLOAD_URL, {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ShoppingListRecipeUpdateTest(FoodgramAPITestCase):
+    """Изменение рецепта сразу отражается в списках покупок."""
+    def test_edit_then_delete_recipe_in_cart(self):
+        recipe = self.create_recipe(amounts=(100,))
+        self.client_for(self.user).post(
+            f'/api/recipes/{recipe.id}/shopping_cart/'
+        )
+        author_client = self.client_for(self.author)
+        response = author_client.patch(f'/api/recipes/{recipe.id}/', {
+            'ingredients': [{'id': self.ingredients[0].id, 'amount': 300}],
+            'tags': [self.tag.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.user.shopping_list.get().total_amount, 300
+        )
+        response = author_client.delete(f'/api/recipes/{recipe.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(self.user.shopping_list.exists())
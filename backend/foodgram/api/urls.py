@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import (RecipeViewSet, TagViewSet,
-                    IngredientViewSet, UsersViewSet)
+                    IngredientViewSet, UsersViewSet, metrics_view)
 
 app_name = 'api'
 
@@ -16,6 +16,7 @@ router.register(r'users', UsersViewSet,
 
 
 urlpatterns = [
+    path('metrics/', metrics_view, name='metrics'),
     path('', include(router.urls)),
     path('auth/', include('djoser.urls.authtoken')),
 ]
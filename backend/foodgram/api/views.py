@@ -1,25 +1,45 @@
+import hashlib
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render
-from django.http import HttpResponse, HttpResponseNotFound
-from django.db.models import Sum
+from django.http import (HttpResponse, HttpResponseNotFound,
+                         StreamingHttpResponse)
+from django.db.models import F
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status
 from rest_framework.permissions import (AllowAny, IsAuthenticatedOrReadOnly,
-                                        IsAuthenticated)
-from rest_framework.decorators import action
+                                        IsAuthenticated, IsAdminUser)
+from rest_framework.decorators import (action, api_view,
+                                       permission_classes)
 from rest_framework.response import Response
 from djoser.views import UserViewSet
 
+from recipes.catalog import (RECIPES_VERSION_KEY, get_version,
+                             viewer_version_key)
+from recipes.index import ingredient_index
+from recipes.relations import add_relations, remove_relations
 from recipes.models import (Ingredient, Tag, Recipe, Follow,
-                            Favorite, ShoppingCart, RecipeIngredient)
+                            Favorite, ShoppingCart, ShoppingListItem)
 from users.models import User
 from users.serializers import ProfileSerializer, UserSerializer
-from .pagination import CustomPagination
+from .catalog import choose_encoding, ingredient_catalog
+from .metrics import registry
+from .mixins import (AnonymousResponseCacheMixin, CatalogConditionalMixin,
+                     VersionedConditionalMixin)
+from .pagination import KeysetPagination, RecipePagination
 from .permissions import IsRecipeAuthor
+from .renderers import CSVRenderer, JSONExportRenderer, PlainTextRenderer
 from .serializers import (IngredientSerializer, TagSerializer,
                           RecipeListSerializer, RecipeSerializer,
                           FollowListSerializer, FollowSerializer,
-                          FavoriteSerializer, ShoppingCartSerializer)
-from .filters import RecipeFilter, IngredientFilter
+                          FavoriteSerializer, ShoppingCartSerializer,
+                          IdListSerializer, ShoppingListItemSerializer,
+                          attach_latest_recipes)
+from .filters import RecipeFilter
+from .shopping_cart import SHOPPING_CART_FORMATS
 
 
 def error_404_view(request, exception):
@@ -27,17 +47,83 @@ def error_404_view(request, exception):
     return render(request, '404.html', status=HttpResponseNotFound)
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+def change_relations(request, model, targets):
+    """
+    Массовое добавление (POST) или удаление (DELETE) связей текущего
+    пользователя с объектами targets, id которых переданы в поле ids.
+    """
+    serializer = IdListSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = set(serializer.validated_data['ids'])
+    if request.method == 'DELETE':
+        remove_relations(model, request.user.id, ids)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    missing = ids - set(
+        targets.filter(pk__in=ids).values_list('pk', flat=True)
+    )
+    if missing:
+        return Response(
+            {'ids': [f'Недопустимые id: {sorted(missing)}']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    add_relations(model, request.user.id, ids)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Метрики запросов в текстовом формате Prometheus."""
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
+
+
+class IngredientViewSet(CatalogConditionalMixin,
+                        viewsets.ReadOnlyModelViewSet):
     """Вьюсет для ингредиентов."""
     queryset = Ingredient.objects.all()
     pagination_class = None
     permission_classes = (AllowAny,)
     serializer_class = IngredientSerializer
-    filter_backends = (IngredientFilter,)
-    search_fields = ('^name',)
+
+    def is_full_catalog(self, request):
+        return 'pk' not in self.kwargs and not request.GET.get('name')
+
+    def get_etag(self, request):
+        etag = super().get_etag(request)
+        if self.is_full_catalog(request):
+            encoding = choose_encoding(request)
+            if encoding != 'identity':
+                etag = f'{etag}-{encoding}'
+        return etag
+
+    def list(self, request, *args, **kwargs):
+        if (self.is_full_catalog(request)
+                and request.accepted_renderer.format == 'json'):
+            return self.catalog_response(request)
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        limit = request.query_params.get('limit')
+        return Response(ingredient_index.search(
+            name, limit=int(limit) if limit and limit.isdigit() else None
+        ))
+
+    def catalog_response(self, request):
+        """Отдаёт заранее отрендеренный и сжатый список ингредиентов."""
+        blob = ingredient_catalog.get()
+        encoding = choose_encoding(request)
+        response = HttpResponse(
+            blob.variants[encoding], content_type='application/json'
+        )
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogConditionalMixin, viewsets.ReadOnlyModelViewSet):
     """Вьюсет для тэгов."""
     queryset = Tag.objects.all()
     pagination_class = None
@@ -45,18 +131,39 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(VersionedConditionalMixin, AnonymousResponseCacheMixin,
+                    viewsets.ModelViewSet):
     """
     Вьюсет для рецептов.
 
     :def favorite: Добавить(удалить) в избранное.
     :def shopping_cart: Добавить(удалить) в список покупок.
     :def download_shopping_cart: Скачать список покупок.
+    :def shopping_list: Просмотр списка покупок.
+    :def feed: Рецепты авторов из подписок.
     """
     queryset = Recipe.objects.all().order_by('-id')
     permission_classes = (IsAuthenticatedOrReadOnly, IsRecipeAuthor)
+    pagination_class = RecipePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    response_cache_version_key = RECIPES_VERSION_KEY
+    conditional_version_key = RECIPES_VERSION_KEY
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'feed':
+            queryset = queryset.filter(author__in=Follow.objects.filter(
+                user=self.request.user
+            ).values('following'))
+        if self.action in ('list', 'feed'):
+            # Рецепты страницы собирает из кэша фрагментов
+            # RecipeFragmentListSerializer, ему достаточно id и полей,
+            # из которых строится версия фрагмента.
+            queryset = queryset.only('id', 'author_id', 'updated_at')
+        elif self.action == 'retrieve':
+            queryset = queryset.with_related(self.request.user)
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
@@ -65,39 +172,42 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def add_favorite_or_shopping_cart(self, request, is_favorite):
         recipe = self.get_object()
-        user = request.user
-        queryset = user.favorite if is_favorite else user.shopping_cart
         model = Favorite if is_favorite else ShoppingCart
         serializer = (
             FavoriteSerializer if is_favorite else ShoppingCartSerializer
         )
-        message = ('Рецепт уже в избранном' if is_favorite
-                   else 'Рецепт уже в списке покупок')
-        if not queryset.filter(pk=recipe.pk).exists():
-            favorite = model.objects.create(user=user, recipe=recipe)
-            serializer = serializer(instance=favorite)
-            return Response(
-                serializer.data, status=status.HTTP_201_CREATED
-            )
-        else:
-            return Response({'message': message},
-                            status=status.HTTP_400_BAD_REQUEST)
+        add_relations(model, request.user.id, [recipe.id])
+        serializer = serializer(
+            instance=model(user=request.user, recipe=recipe),
+            context={'request': request}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete_favorite_or_shopping_cart(self, request, is_favorite):
         recipe = self.get_object()
-        user = request.user
         model = Favorite if is_favorite else ShoppingCart
-        message = ('Рецепт не найден в избранном' if is_favorite
-                   else 'Рецепт не найден в списке покупок')
-        try:
-            to_delete = model.objects.get(user=user, recipe=recipe)
-            to_delete.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Favorite.DoesNotExist:
-            return Response(
-                {'message': message},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        remove_relations(model, request.user.id, [recipe.id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False, methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='favorite', url_name='favorite-batch',
+    )
+    def favorite_batch(self, request):
+        return change_relations(
+            request, Favorite, Recipe.objects.all()
+        )
+
+    @action(
+        detail=False, methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='shopping_cart', url_name='shopping-cart-batch',
+    )
+    def shopping_cart_batch(self, request):
+        return change_relations(
+            request, ShoppingCart, Recipe.objects.all()
+        )
 
     @action(
         detail=True, methods=['post'],
@@ -129,28 +239,77 @@ class RecipeViewSet(viewsets.ModelViewSet):
         detail=False, methods=['get'],
         permission_classes=[IsAuthenticated],
         url_path='download_shopping_cart',
+        renderer_classes=[PlainTextRenderer, CSVRenderer, JSONExportRenderer],
     )
     def download_shopping_cart(self, request):
-        if not request.user.shopping_cart.exists():
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-        items = (
-            RecipeIngredient.objects
-            .filter(recipe__in_shopping_cart__user=request.user)
+        items = iter(
+            ShoppingListItem.objects
+            .filter(user=request.user)
             .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(amount_sum=Sum('amount'))
-        )
-        shopping_cart_text = "Shopping Cart\n"
-        for item in items:
-            ingredient_name = item['ingredient__name']
-            measurement_unit = item['ingredient__measurement_unit']
-            amount = item['amount_sum']
-            shopping_cart_text += (
-                f"{ingredient_name} ({measurement_unit}) - {amount}\n"
-            )
-        response = HttpResponse(shopping_cart_text, content_type='text/plain')
+            .annotate(amount_sum=F('total_amount'))
+            .order_by('ingredient__name')
+            .iterator()
+        )
+        first = next(items, None)
+        if first is None:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            SHOPPING_CART_FORMATS[renderer.format](chain((first,), items)),
+            content_type=f'{renderer.media_type}; charset=utf-8'
+        )
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_cart.txt"'
+            f'attachment; filename="shopping_cart.{renderer.format}"'
+        )
+        return response
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[IsAuthenticated],
+        url_path='shopping_list',
+    )
+    def shopping_list(self, request):
+        items = (
+            ShoppingListItem.objects
+            .filter(user=request.user)
+            .select_related('ingredient')
+            .order_by('ingredient__name')
+        )
+        return Response(ShoppingListItemSerializer(items, many=True).data)
+
+    @action(
+        detail=False, methods=['get'],
+        permission_classes=[IsAuthenticated],
+        url_path='feed',
+    )
+    def feed(self, request):
+        """
+        Лента: рецепты авторов из подписок, новые первыми, с пагинацией
+        по курсору. При FEED_CACHE_TIMEOUT страницы ленты кэшируются
+        для пользователя на это время; изменение рецептов, подписка или
+        отписка сбрасывают кэш сразу, так как ключ включает версию данных
+        рецептов и версию отметок пользователя.
+        """
+        timeout = settings.FEED_CACHE_TIMEOUT
+        if timeout:
+            versions = ' '.join(get_version(version_key) for version_key in (
+                RECIPES_VERSION_KEY, viewer_version_key(request.user.pk)
+            ))
+            key = f'recipes:feed:{request.user.pk}:' + hashlib.md5(
+                f'{versions} {request.build_absolute_uri()}'.encode()
+            ).hexdigest()
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = RecipeListSerializer(
+            page, many=True, context=self.get_serializer_context()
         )
+        response = paginator.get_paginated_response(serializer.data)
+        if timeout:
+            cache.set(key, response.data, timeout)
         return response
 
 
@@ -187,10 +346,12 @@ class UsersViewSet(UserViewSet):
         url_path='subscriptions',
     )
     def subscriptions(self, request):
-        subscriptions = User.objects.filter(following__user=self.request.user)
-        paginator = CustomPagination()
-        subscriptions_paginated = paginator.paginate_queryset(
-            subscriptions, request
+        subscriptions = User.objects.filter(
+            following__user=self.request.user
+        ).order_by('-id')
+        paginator = RecipePagination()
+        subscriptions_paginated = attach_latest_recipes(
+            paginator.paginate_queryset(subscriptions, request), request
         )
         serializer = FollowListSerializer(
             subscriptions_paginated, many=True, context={'request': request}
@@ -209,23 +370,25 @@ class UsersViewSet(UserViewSet):
                                             'following': user_to_subscribe.id},
                                       context={'request': request})
         serializer.is_valid(raise_exception=True)
-        if not current_user.follower.filter(following=user_to_subscribe
-                                            ).exists():
-            Follow.objects.create(
-                user=current_user, following=user_to_subscribe
-            )
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        else:
-            return Response({'message': 'Пользователь уже подписан'},
-                            status=status.HTTP_400_BAD_REQUEST)
+        add_relations(Follow, current_user.id, [user_to_subscribe.id])
+        serializer = FollowListSerializer(
+            attach_latest_recipes([user_to_subscribe], request)[0],
+            context={'request': request}
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
     def delete_subscribe(self, request, id):
-        user_to_subscribe = self.get_object()
-        current_user = request.user
-        if current_user.follower.filter(following=user_to_subscribe).exists():
-            current_user.follower.get(following=user_to_subscribe).delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        else:
-            return Response({'message': 'Пользователь не найден в подписках'},
-                            status=status.HTTP_400_BAD_REQUEST)
+        user_to_unsubscribe = self.get_object()
+        remove_relations(Follow, request.user.id, [user_to_unsubscribe.id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False, methods=['post', 'delete'],
+        permission_classes=[IsAuthenticated],
+        url_path='subscribe', url_name='subscribe-batch',
+    )
+    def subscribe_batch(self, request):
+        return change_relations(
+            request, Follow, User.objects.exclude(pk=request.user.pk)
+        )
@@ -0,0 +1,46 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """Время выполнения SQL и сериализации в рамках одного запроса."""
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self._serializer_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_count += 1
+
+
+@contextmanager
+def serializer_timer():
+    """Учитывает время только внешнего уровня вложенных сериализаторов."""
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    timing._serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing._serializer_depth -= 1
+        if not timing._serializer_depth:
+            timing.serializer_time += time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """Добавляет время сериализации в метрики текущего запроса."""
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
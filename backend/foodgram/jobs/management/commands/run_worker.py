@@ -0,0 +1,49 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import claim, run
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Количество потоков-исполнителей.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, если очередь пуста.'
+        )
+        parser.add_argument(
+            '--visibility-timeout', type=int, default=300,
+            help='Через сколько секунд незавершённую задачу может '
+                 'забрать другой воркер.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить доступные задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        done = failed = 0
+        with ThreadPoolExecutor(concurrency) as executor:
+            while True:
+                jobs = claim(concurrency, options['visibility_timeout'])
+                for succeeded in executor.map(run, jobs):
+                    done += succeeded
+                    failed += not succeeded
+                if jobs:
+                    continue
+                if options['once']:
+                    break
+                connections.close_all()
+                time.sleep(options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
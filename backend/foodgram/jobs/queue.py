@@ -0,0 +1,108 @@
+"""
+Очередь фоновых задач в таблице Job без внешнего брокера.
+
+Задачи регистрируются декоратором task в модулях tasks.py приложений
+и ставятся в очередь через enqueue(). Воркер (manage.py run_worker)
+забирает задачи, продлевая им видимость на visibility_timeout: если
+воркер упал, задача снова станет доступной по истечении таймаута.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+RETRY_BASE_DELAY = 10
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу под её полным именем."""
+    func.task_name = f'{func.__module__}.{func.__name__}'
+    TASKS[func.task_name] = func
+    return func
+
+
+def enqueue(func, *, delay=None, max_attempts=5, **kwargs):
+    """
+    Ставит задачу в очередь. Аргументы передаются именованными и должны
+    сериализоваться в JSON. Внутри транзакции задача станет видна
+    воркеру только после фиксации.
+
+    При JOBS_RUN_INLINE задача выполняется сразу после фиксации
+    транзакции в текущем процессе. Ошибка задачи записывается в лог
+    и не прерывает запрос, как и при выполнении воркером.
+    """
+    if settings.JOBS_RUN_INLINE:
+        transaction.on_commit(lambda: run_inline(func, kwargs))
+        return None
+    return Job.objects.create(
+        task=func.task_name,
+        payload=kwargs,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + (delay or timedelta()),
+    )
+
+
+def run_inline(func, kwargs):
+    try:
+        func(**kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', func.task_name)
+
+
+def claim(limit, visibility_timeout):
+    """Забирает до limit задач, готовых к выполнению."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(Job.objects.select_for_update(skip_locked=True).filter(
+            Q(status=Job.QUEUED) | Q(status=Job.RUNNING, locked_until__lt=now),
+            run_at__lte=now,
+        ).order_by('run_at', 'id')[:limit])
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=Job.RUNNING,
+            attempts=F('attempts') + 1,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def run(job):
+    """
+    Выполняет задачу. Успешная задача удаляется из очереди, неудачная
+    откладывается с экспоненциальной задержкой, а после max_attempts
+    попыток остаётся в статусе failed.
+    """
+    close_old_connections()
+    try:
+        func = TASKS[job.task]
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Задача %s завершилась с ошибкой', job)
+        if job.attempts >= job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, locked_until=None, last_error=error
+            )
+        else:
+            delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, locked_until=None, last_error=error,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        return False
+    else:
+        Job.objects.filter(pk=job.pk).delete()
+        return True
+    finally:
+        close_old_connections()
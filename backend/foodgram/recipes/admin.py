@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models import Prefetch
 
 from .models import Ingredient, Tag, RecipeIngredient, Recipe
+from .shopping_list import recipe_amounts, update_recipe_in_shopping_lists
 
 
 class BaseAdmin(admin.ModelAdmin):
@@ -10,18 +12,24 @@ class BaseAdmin(admin.ModelAdmin):
 @admin.register(Ingredient)
 class IngredientAdmin(BaseAdmin):
     list_display = ('name', 'measurement_unit')
-    list_filter = ('name', )
+    list_filter = ('measurement_unit', )
+    search_fields = ('^name', )
+    show_full_result_count = False
 
 
 @admin.register(Tag)
 class TagAdmin(BaseAdmin):
-    pass
+    search_fields = ('name', 'slug')
 
 
 class RecipeIngredientsAdmin(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
     min_num = 1
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ingredient')
 
 
 @admin.register(Recipe)
@@ -30,16 +38,35 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'author', 'cooking_time',
                     'get_ingredients', 'get_favorites_count')
     list_display_links = ('name', 'author')
-    list_filter = ('name', 'author', 'tags')
+    list_filter = ('tags',)
+    search_fields = ('name', 'author__username', 'author__email')
+    autocomplete_fields = ('author', 'tags')
     inlines = (RecipeIngredientsAdmin,)
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            'search_vector'
+        ).select_related('author').prefetch_related(Prefetch(
+            'recipeingredient_set',
+            queryset=RecipeIngredient.objects.select_related('ingredient')
+        ))
+
+    def save_related(self, request, form, formsets, change):
+        if not change:
+            return super().save_related(request, form, formsets, change)
+        old_amounts = recipe_amounts(form.instance.id)
+        super().save_related(request, form, formsets, change)
+        update_recipe_in_shopping_lists(form.instance.id, old_amounts)
 
     def get_ingredients(self, obj):
-        queryset = RecipeIngredient.objects.filter(recipe_id=obj.id).all()
         return ', '.join(
             [f' {item.ingredient.name} {item.amount} '
-             f'{item.ingredient.measurement_unit}' for item in queryset])
+             f'{item.ingredient.measurement_unit}'
+             for item in obj.recipeingredient_set.all()])
 
     def get_favorites_count(self, obj):
-        return obj.favorited.count()
+        return obj.favorites_count
 
     get_favorites_count.short_description = 'Favorites Count'
+    get_favorites_count.admin_order_field = 'favorites_count'
@@ -5,3 +5,6 @@ class RecipiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipes'
     verbose_name = 'Recipes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
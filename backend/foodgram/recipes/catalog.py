@@ -0,0 +1,84 @@
+"""
+Версии данных в кэше Django, из которых строятся ETag и ключи кэша
+ответов. Их меняют сигналы в веб-процессах, воркер и команды manage.py,
+поэтому кэш должен быть общим для всех процессов (см. CACHES).
+"""
+import time
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = 'recipes:catalog_version'
+RECIPES_VERSION_KEY = 'recipes:recipes_version'
+
+
+def new_version():
+    """Версия вида '<unix-время>:<uuid>': уникальна и помнит момент."""
+    return f'{time.time():.6f}:{uuid4().hex}'
+
+
+def version_time(version):
+    """Момент создания версии или None для версии без времени."""
+    timestamp, separator, _ = version.partition(':')
+    if not separator:
+        return None
+    return float(timestamp)
+
+
+def get_version(key):
+    """Текущая версия данных; создаётся при первом обращении."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, new_version(), None)
+        version = cache.get(key) or new_version()
+    return version
+
+
+def bump_version(key):
+    cache.set(key, new_version(), None)
+
+
+def get_catalog_version():
+    """Текущая версия справочников тэгов и ингредиентов."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """
+    Меняет версию после фиксации транзакции, как bump_recipes_version:
+    иначе блоб, индекс ингредиентов и ETag успели бы собраться из старых
+    строк под новой версией и остались бы такими до следующего изменения.
+    """
+    transaction.on_commit(lambda: bump_version(CATALOG_VERSION_KEY))
+
+
+def get_recipes_version():
+    """Текущая версия данных, из которых строится выдача рецептов."""
+    return get_version(RECIPES_VERSION_KEY)
+
+
+def bump_recipes_version():
+    """
+    Меняет версию после фиксации транзакции: иначе параллельный запрос
+    успел бы закэшировать ещё старые данные под новой версией.
+    """
+    transaction.on_commit(lambda: bump_version(RECIPES_VERSION_KEY))
+
+
+def author_version_key(user_id):
+    """Версия полей автора, которые выводятся вместе с его рецептами."""
+    return f'recipes:author_version:{user_id}'
+
+
+def bump_author_version(user_id):
+    transaction.on_commit(lambda: bump_version(author_version_key(user_id)))
+
+
+def viewer_version_key(user_id):
+    """Версия избранного, корзины и подписок пользователя."""
+    return f'recipes:viewer_version:{user_id}'
+
+
+def bump_viewer_version(user_id):
+    transaction.on_commit(lambda: bump_version(viewer_version_key(user_id)))
@@ -1,2 +1,13 @@
 REGEX = r'^[\w.@+-_]'
 MIN_NUMBER = 1
+IMAGE_MAX_SIZE = (1920, 1920)
+IMAGE_QUALITY = 85
+IMAGE_VARIANTS = {
+    'thumbnail': (240, 240),
+    'card': (640, 640),
+}
+IMAGE_VARIANT_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+BATCH_MAX_SIZE = 100
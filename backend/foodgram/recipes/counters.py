@@ -0,0 +1,71 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class CounterFieldsMixin:
+    """
+    Не записывает счётчики counter_fields при сохранении существующего
+    объекта: их меняют только атомарные UPDATE, а значения в загруженном
+    экземпляре могут устареть и затереть текущие.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not args
+                and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+def change_counter(model, pk, field, delta):
+    """Атомарно изменяет счётчик, не опуская его ниже нуля."""
+    change_counters(model, [pk], field, delta)
+
+
+def change_counters(model, pks, field, delta):
+    """Атомарно изменяет счётчики строк pks, не опуская их ниже нуля."""
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def count_of(model, field):
+    """Количество связанных объектов model для каждой строки."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def counter_definitions(Recipe, User, Favorite, ShoppingCart, Follow):
+    """Счётчики в формате (модель, поле, выражение для пересчёта)."""
+    return (
+        (Recipe, 'favorites_count', count_of(Favorite, 'recipe')),
+        (Recipe, 'in_carts_count', count_of(ShoppingCart, 'recipe')),
+        (User, 'recipes_count', count_of(Recipe, 'author')),
+        (User, 'followers_count', count_of(Follow, 'following')),
+    )
+
+
+def reconcile_counters(*models):
+    """
+    Пересчитывает расходящиеся счётчики.
+
+    Возвращает количество исправленных строк по каждому счётчику.
+    """
+    fixed = {}
+    for model, field, actual in counter_definitions(*models):
+        fixed[f'{model.__name__}.{field}'] = (
+            model.objects.exclude(**{field: actual})
+            .update(**{field: actual})
+        )
+    return fixed
@@ -0,0 +1,114 @@
+"""Нормализация изображений рецептов и уменьшенные копии для карточек."""
+import hashlib
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import (IMAGE_MAX_SIZE, IMAGE_QUALITY, IMAGE_VARIANTS,
+                        IMAGE_VARIANT_FORMATS)
+from .storage import UPLOADS_DIR, content_storage, image_path
+
+VARIANTS_DIR = 'image/variants'
+
+
+def flatten(image):
+    """Приводит изображение к RGB, заменяя прозрачность белым фоном."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=IMAGE_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def normalize_image(file, name='image.jpg'):
+    """
+    Поворачивает изображение по EXIF, ограничивает его размеры
+    и перекодирует в JPEG без метаданных.
+    """
+    with Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(IMAGE_MAX_SIZE)
+        content = encode(flatten(image), 'JPEG')
+    return ContentFile(content, name=os.path.splitext(name)[0] + '.jpg')
+
+
+def is_upload(name):
+    """Файл загружен пользователем и ещё не нормализован."""
+    return name.startswith(f'{UPLOADS_DIR}/')
+
+
+def save_normalized(name, storage=content_storage):
+    """Сохраняет нормализованную копию файла и возвращает её имя."""
+    with storage.open(name) as file:
+        content = normalize_image(file)
+    return storage.save(image_path(content, '.jpg'), content)
+
+
+def variant_name(name, variant, extension):
+    """
+    Имя копии строится по хешу полного имени оригинала, чтобы копии
+    image/temp.jpg и image/temp.png не совпадали, и включает размеры:
+    при изменении IMAGE_VARIANTS меняются и URL, поэтому копии можно
+    кэшировать как неизменяемые.
+    """
+    digest = hashlib.sha256(name.encode()).hexdigest()[:32]
+    width, height = IMAGE_VARIANTS[variant]
+    return f'{VARIANTS_DIR}/{digest}_{width}x{height}.{extension}'
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, extension)
+        for variant in IMAGE_VARIANTS
+        for extension in IMAGE_VARIANT_FORMATS
+    ]
+
+
+def build_variants(name, storage=content_storage, force=False):
+    """
+    Создаёт недостающие уменьшенные копии изображения во всех форматах.
+    Возвращает количество записанных файлов.
+    """
+    missing = {
+        (variant, extension): variant_name(name, variant, extension)
+        for variant in IMAGE_VARIANTS
+        for extension in IMAGE_VARIANT_FORMATS
+    }
+    if not force:
+        missing = {key: path for key, path in missing.items()
+                   if not storage.exists(path)}
+    if not missing:
+        return 0
+    with storage.open(name) as file, Image.open(file) as original:
+        original = flatten(ImageOps.exif_transpose(original))
+        for variant, size in IMAGE_VARIANTS.items():
+            image = original.copy()
+            image.thumbnail(size)
+            for extension, image_format in IMAGE_VARIANT_FORMATS.items():
+                path = missing.get((variant, extension))
+                if path is None:
+                    continue
+                if storage.exists(path):
+                    storage.delete(path)
+                storage.save(path, ContentFile(encode(image, image_format)))
+    return len(missing)
+
+
+def variant_urls(name, storage=content_storage):
+    """URL уменьшенных копий: {вариант: {формат: url}}."""
+    return {
+        variant: {
+            extension: storage.url(variant_name(name, variant, extension))
+            for extension in IMAGE_VARIANT_FORMATS
+        }
+        for variant in IMAGE_VARIANTS
+    }
@@ -0,0 +1,65 @@
+import threading
+from bisect import bisect_left
+
+from .catalog import get_catalog_version
+from .models import Ingredient
+
+PREFIX_END = '\U0010ffff'
+
+
+class IngredientIndex:
+    """
+    Индекс названий ингредиентов в памяти процесса.
+
+    Названия приводятся к casefold и хранятся отсортированными, поиск по
+    префиксу выполняется бинарным поиском. Индекс перестраивается при
+    первом обращении после изменения ингредиентов, в том числе в других
+    процессах — по версии справочников.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+
+    def invalidate(self):
+        self._data = None
+
+    def _load(self):
+        version = get_catalog_version()
+        data = self._data
+        if data is None or self._version != version:
+            with self._lock:
+                if self._data is None or self._version != version:
+                    self._data = self._build()
+                    self._version = version
+                data = self._data
+        return data
+
+    def _build(self):
+        items = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda item: (item['name'].casefold(), item['id'])
+        )
+        keys = [item['name'].casefold() for item in items]
+        return keys, items
+
+    def search(self, query, limit=None):
+        """
+        Ингредиенты, название которых начинается с query, а за ними —
+        содержащие query внутри названия.
+        """
+        keys, items = self._load()
+        query = query.casefold()
+        start = bisect_left(keys, query)
+        end = bisect_left(keys, query + PREFIX_END, start)
+        result = items[start:end]
+        if limit is not None and len(result) >= limit:
+            return result[:limit]
+        result += [
+            item for key, item in zip(keys, items)
+            if query in key and not key.startswith(query)
+        ]
+        return result if limit is None else result[:limit]
+
+
+ingredient_index = IngredientIndex()
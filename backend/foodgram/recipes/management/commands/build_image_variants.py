@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_variants
+from recipes.storage import content_storage
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие уменьшенные копии изображений рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии, даже если они уже существуют.'
+        )
+
+    def handle(self, *args, **options):
+        names = Recipe.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().order_by()
+        built = failed = 0
+        for name in names.iterator():
+            try:
+                built += build_variants(
+                    name, content_storage, force=options['force']
+                )
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано файлов: {built}, ошибок: {failed}'
+        ))
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.images import variant_names
+from recipes.models import Recipe
+from recipes.storage import content_storage
+
+
+def walk(storage, path):
+    directories, files = storage.listdir(path)
+    for file in files:
+        yield f'{path}/{file}'
+    for directory in directories:
+        yield from walk(storage, f'{path}/{directory}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет изображения и их копии, на которые не ссылается '
+        'ни один рецепт.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help='Не трогать файлы моложе этого возраста: они могут '
+                 'принадлежать ещё не сохранённому рецепту.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести список файлов, не удаляя их.'
+        )
+
+    def handle(self, *args, **options):
+        storage = content_storage
+        referenced = set()
+        names = Recipe.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().order_by()
+        for name in names.iterator():
+            referenced.add(name)
+            referenced.update(variant_names(name))
+        if not storage.exists('image'):
+            return
+        threshold = timezone.now() - timedelta(
+            minutes=options['grace_minutes']
+        )
+        removed = 0
+        for path in walk(storage, 'image'):
+            if path in referenced:
+                continue
+            if storage.get_modified_time(path) > threshold:
+                continue
+            self.stdout.write(path)
+            if not options['dry_run']:
+                storage.delete(path)
+            removed += 1
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} неиспользуемых файлов: {removed}'
+        ))
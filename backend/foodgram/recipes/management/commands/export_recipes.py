@@ -0,0 +1,65 @@
+import json
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, RecipeIngredient
+from recipes.utils import batches
+
+
+class Command(BaseCommand):
+    help = 'Выгружает рецепты в формате NDJSON (один рецепт на строку).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Файл для выгрузки.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = (open(options['output'], 'w', encoding='utf-8')
+                  if options['output'] else sys.stdout)
+        total = 0
+        try:
+            recipes = Recipe.objects.values(
+                'id', 'author__email', 'name', 'text', 'cooking_time',
+                'image'
+            ).order_by('id').iterator(chunk_size=options['batch_size'])
+            for batch in batches(recipes, options['batch_size']):
+                for recipe in self.with_relations(batch):
+                    output.write(json.dumps(recipe, ensure_ascii=False))
+                    output.write('\n')
+                total += len(batch)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        self.stderr.write(self.style.SUCCESS(f'Выгружено рецептов: {total}'))
+
+    def with_relations(self, batch):
+        """Добавляет тэги и ингредиенты двумя запросами на пачку."""
+        ids = [recipe['id'] for recipe in batch]
+        tags = defaultdict(list)
+        for recipe_id, slug in Recipe.tags.through.objects.filter(
+            recipe_id__in=ids
+        ).values_list('recipe_id', 'tag__slug').order_by('id'):
+            tags[recipe_id].append(slug)
+        ingredients = defaultdict(list)
+        for recipe_id, name, unit, amount in RecipeIngredient.objects.filter(
+            recipe_id__in=ids
+        ).values_list(
+            'recipe_id', 'ingredient__name', 'ingredient__measurement_unit',
+            'amount'
+        ).order_by('id'):
+            ingredients[recipe_id].append({
+                'name': name, 'measurement_unit': unit, 'amount': amount
+            })
+        for recipe in batch:
+            yield {
+                'id': recipe['id'],
+                'author': recipe['author__email'],
+                'name': recipe['name'],
+                'text': recipe['text'],
+                'cooking_time': recipe['cooking_time'],
+                'image': recipe['image'],
+                'tags': tags[recipe['id']],
+                'ingredients': ingredients[recipe['id']],
+            }
@@ -0,0 +1,211 @@
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from recipes.catalog import bump_recipes_version
+from recipes.counters import reconcile_counters
+from recipes.models import (Favorite, Follow, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from recipes.shopping_list import rebuild_totals
+from recipes.utils import batches, copy_objects
+from users.models import User
+
+WORDS = ('быстро', 'вкусно', 'просто', 'запечь', 'обжарить', 'сварить',
+         'нарезать', 'смешать', 'посолить', 'подавать', 'горячим',
+         'холодным', 'с', 'и', 'на', 'в', 'минут', 'духовке', 'сковороде')
+
+
+class ZipfSampler:
+    """Выбор элементов с вероятностью, обратной рангу в степени s."""
+    def __init__(self, rng, population, exponent):
+        self.rng = rng
+        self.population = population
+        self.weights = list(accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+
+    def sample(self, count):
+        return self.rng.choices(
+            self.population, cum_weights=self.weights, k=count
+        )
+
+    def distinct(self, count, exclude=()):
+        result = []
+        for item in self.sample(count * 3):
+            if item not in result and item not in exclude:
+                result.append(item)
+                if len(result) == count:
+                    break
+        return result
+
+
+class Command(BaseCommand):
+    help = ('Создаёт детерминированный синтетический набор пользователей, '
+            'рецептов, подписок, избранного и списков покупок.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Подписок на пользователя.')
+        parser.add_argument('--favorites', type=int, default=30,
+                            help='Рецептов в избранном на пользователя.')
+        parser.add_argument('--cart', type=int, default=5,
+                            help='Рецептов в списке покупок на пользователя.')
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Показатель распределения Ципфа.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--image', default='image/generated.png')
+
+    def handle(self, *args, **options):
+        ingredient_ids = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not ingredient_ids:
+            raise CommandError(
+                'Нет ингредиентов, сначала выполните load_ingredients'
+            )
+        self.options = options
+        self.created = {}
+        self.rng = random.Random(options['seed'])
+        self.rng.shuffle(ingredient_ids)
+        started = time.monotonic()
+        tag_ids = self.ensure_tags()
+        user_ids = self.create_users()
+        recipe_ids = self.create_recipes(user_ids, ingredient_ids, tag_ids)
+        self.create_relations(user_ids, recipe_ids)
+        for model, total in self.created.items():
+            self.stdout.write(f'{model._meta.verbose_name}: {total}')
+        self.stdout.write('Пересчёт счётчиков и списков покупок...')
+        reconcile_counters(Recipe, User, Favorite, ShoppingCart, Follow)
+        rebuild_totals(batch_size=options['batch_size'])
+        bump_recipes_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с'
+        ))
+
+    def bulk(self, rows_by_model, ignore_conflicts=False):
+        """
+        Сохраняет объекты нескольких моделей в одной транзакции.
+
+        В Postgres объекты с заранее заданными id загружаются через COPY.
+        """
+        use_copy = (connection.vendor == 'postgresql'
+                    and not ignore_conflicts)
+        with transaction.atomic():
+            for model, rows in rows_by_model:
+                if use_copy:
+                    copy_objects(model, rows, connection)
+                else:
+                    model.objects.bulk_create(
+                        rows, ignore_conflicts=ignore_conflicts
+                    )
+                self.created[model] = self.created.get(model, 0) + len(rows)
+
+    def next_ids(self, model, count):
+        start = (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        return range(start, start + count)
+
+    def reset_sequences(self, *models):
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def ensure_tags(self):
+        seed = self.options['seed']
+        Tag.objects.bulk_create(
+            [Tag(name=f'Тэг {seed}-{number}',
+                 slug=f'gen-{seed}-{number}',
+                 color=f'#{seed % 256:02x}{number:04x}')
+             for number in range(self.options['tags'])],
+            ignore_conflicts=True
+        )
+        return list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+    def create_users(self):
+        seed = self.options['seed']
+        password = make_password('generated-password')
+        user_ids = self.next_ids(User, self.options['users'])
+        for batch in batches(user_ids, self.options['batch_size']):
+            self.bulk(((User, [
+                User(id=user_id, username=f'gen{seed}_{user_id}',
+                     email=f'gen{seed}_{user_id}@example.com',
+                     first_name='Имя', last_name='Фамилия',
+                     password=password)
+                for user_id in batch
+            ]),))
+        self.reset_sequences(User)
+        return user_ids
+
+    def create_recipes(self, user_ids, ingredient_ids, tag_ids):
+        options = self.options
+        exponent = options['zipf']
+        authors = ZipfSampler(self.rng, user_ids, exponent)
+        ingredients = ZipfSampler(self.rng, ingredient_ids, exponent)
+        tags = ZipfSampler(self.rng, tag_ids, exponent)
+        max_ingredients = options['ingredients_per_recipe'] * 2 - 1
+        recipe_ids = self.next_ids(Recipe, options['recipes'])
+        for batch in batches(recipe_ids, options['batch_size']):
+            recipes, recipe_ingredients, recipe_tags = [], [], []
+            for recipe_id, author_id in zip(batch,
+                                            authors.sample(len(batch))):
+                recipes.append(Recipe(
+                    id=recipe_id, author_id=author_id,
+                    name=f'Рецепт {recipe_id}',
+                    text=' '.join(self.rng.choices(WORDS, k=30)),
+                    cooking_time=self.rng.randint(1, 180),
+                    image=options['image']
+                ))
+                for ingredient_id in ingredients.distinct(
+                    self.rng.randint(1, max_ingredients)
+                ):
+                    recipe_ingredients.append(RecipeIngredient(
+                        recipe_id=recipe_id, ingredient_id=ingredient_id,
+                        amount=self.rng.randint(1, 500)
+                    ))
+                for tag_id in tags.distinct(self.rng.randint(1, 3)):
+                    recipe_tags.append(
+                        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                    )
+            self.bulk(((Recipe, recipes),
+                       (RecipeIngredient, recipe_ingredients),
+                       (Recipe.tags.through, recipe_tags)))
+        self.reset_sequences(Recipe)
+        return recipe_ids
+
+    def create_relations(self, user_ids, recipe_ids):
+        options = self.options
+        exponent = options['zipf']
+        authors = ZipfSampler(self.rng, user_ids, exponent)
+        recipes = ZipfSampler(self.rng, recipe_ids, exponent)
+        users_per_batch = max(1, options['batch_size'] // max(
+            1, options['follows'] + options['favorites'] + options['cart']
+        ))
+        for batch in batches(user_ids, users_per_batch):
+            follows, favorites, carts = [], [], []
+            for user_id in batch:
+                for author_id in authors.distinct(options['follows'],
+                                                  exclude=(user_id,)):
+                    follows.append(
+                        Follow(user_id=user_id, following_id=author_id)
+                    )
+                for recipe_id in recipes.distinct(options['favorites']):
+                    favorites.append(
+                        Favorite(user_id=user_id, recipe_id=recipe_id)
+                    )
+                for recipe_id in recipes.distinct(options['cart']):
+                    carts.append(
+                        ShoppingCart(user_id=user_id, recipe_id=recipe_id)
+                    )
+            self.bulk(((Follow, follows), (Favorite, favorites),
+                       (ShoppingCart, carts)), ignore_conflicts=True)
@@ -0,0 +1,105 @@
+import json
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from recipes.catalog import bump_catalog_version, bump_recipes_version
+from recipes.counters import change_counter
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.utils import batches
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Загружает рецепты из NDJSON, созданного export_recipes. '
+            'Каждая пачка сохраняется в отдельной транзакции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Файл NDJSON.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        source = (open(options['path'], encoding='utf-8')
+                  if options['path'] else sys.stdin)
+        imported = skipped = 0
+        try:
+            lines = (json.loads(line) for line in source if line.strip())
+            for batch in batches(lines, options['batch_size']):
+                with transaction.atomic():
+                    created = self.import_batch(batch)
+                imported += created
+                skipped += len(batch) - created
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        bump_catalog_version()
+        bump_recipes_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено рецептов: {imported}, пропущено: {skipped}'
+        ))
+
+    def resolve_ingredients(self, batch):
+        keys = {
+            (item['name'], item['measurement_unit'])
+            for recipe in batch for item in recipe['ingredients']
+        }
+        Ingredient.objects.bulk_create(
+            [Ingredient(name=name, measurement_unit=unit)
+             for name, unit in keys],
+            ignore_conflicts=True
+        )
+        names = {name for name, _ in keys}
+        return {
+            (name, unit): pk
+            for pk, name, unit in Ingredient.objects.filter(
+                name__in=names
+            ).values_list('id', 'name', 'measurement_unit')
+        }
+
+    def import_batch(self, batch):
+        authors = dict(User.objects.filter(
+            email__in={recipe['author'] for recipe in batch}
+        ).values_list('email', 'id'))
+        tags = dict(Tag.objects.filter(
+            slug__in={slug for recipe in batch for slug in recipe['tags']}
+        ).values_list('slug', 'id'))
+        ingredients = self.resolve_ingredients(batch)
+        batch = [recipe for recipe in batch if recipe['author'] in authors]
+        recipes = [
+            Recipe(
+                author_id=authors[recipe['author']],
+                name=recipe['name'],
+                text=recipe['text'],
+                cooking_time=recipe['cooking_time'],
+                image=recipe['image'],
+            )
+            for recipe in batch
+        ]
+        if connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(recipes)
+            for author_id, total in Counter(
+                recipe.author_id for recipe in recipes
+            ).items():
+                change_counter(User, author_id, 'recipes_count', total)
+        else:
+            for recipe in recipes:
+                recipe.save()
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredients[
+                    (item['name'], item['measurement_unit'])
+                ],
+                amount=item['amount'],
+            )
+            for recipe, data in zip(recipes, batch)
+            for item in data['ingredients']
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag_id=tags[slug])
+            for recipe, data in zip(recipes, batch)
+            for slug in data['tags'] if slug in tags
+        ])
+        return len(recipes)
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipes.catalog import bump_catalog_version, bump_recipes_version
+from recipes.index import ingredient_index
+from recipes.models import Ingredient
+from recipes.utils import batches
+
+DEFAULT_MEASUREMENT_UNIT = 'г'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if row:
+            yield row[0], row[1] if len(row) > 1 else DEFAULT_MEASUREMENT_UNIT
+
+
+def read_json(file):
+    """Построчно разбирает JSON-массив объектов, не загружая его целиком."""
+    decoder = json.JSONDecoder()
+    buffer, position = file.read(READ_CHUNK_SIZE).lstrip(), 1
+    if not buffer.startswith('['):
+        raise CommandError('Ожидается JSON-массив ингредиентов')
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if buffer[position:position + 1] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON-файл')
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield (item['name'],
+               item.get('measurement_unit') or DEFAULT_MEASUREMENT_UNIT)
+        position = end
+
+
+READERS = {'csv': read_csv, 'json': read_json}
+
+
+class Command(BaseCommand):
+    help = ('Загружает ингредиенты из CSV или JSON. Повторный запуск '
+            'не создаёт дубликатов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?',
+            default=str(Path(settings.BASE_DIR) / 'data' / 'ingredients.csv')
+        )
+        parser.add_argument('--format', choices=READERS)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY в Postgres.'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path.name}')
+        use_copy = (connection.vendor == 'postgresql'
+                    and not options['no_copy'])
+        insert_batch = self.copy_batch if use_copy else self.bulk_batch
+        started = time.monotonic()
+        total = created = 0
+        with path.open(encoding='utf-8', newline='') as file:
+            for batch in batches(READERS[file_format](file),
+                                 options['batch_size']):
+                with transaction.atomic():
+                    created += insert_batch(batch)
+                total += len(batch)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        bump_catalog_version()
+        bump_recipes_version()
+        ingredient_index.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {total} строк, добавлено {created} ингредиентов '
+            f'за {elapsed:.2f} с ({total / elapsed:.0f} строк/с)'
+        ))
+
+    def bulk_batch(self, batch):
+        before = Ingredient.objects.count()
+        Ingredient.objects.bulk_create(
+            [Ingredient(name=name, measurement_unit=unit)
+             for name, unit in batch],
+            ignore_conflicts=True
+        )
+        return Ingredient.objects.count() - before
+
+    def copy_batch(self, batch):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(batch)
+        buffer.seek(0)
+        table = Ingredient._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'CREATE TEMPORARY TABLE ingredient_load '
+                '(name varchar(200), measurement_unit varchar(200)) '
+                'ON COMMIT DROP'
+            )
+            cursor.copy_expert(
+                'COPY ingredient_load (name, measurement_unit) '
+                'FROM STDIN WITH (FORMAT csv)', buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT name, measurement_unit FROM ingredient_load '
+                'ON CONFLICT (name, measurement_unit) DO NOTHING'
+            )
+            return cursor.rowcount
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.shopping_list import (expected_totals, rebuild_totals,
+                                   stored_totals)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и проверяет суммы ингредиентов в списках покупок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить суммы, не изменяя таблицу.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rebuild_totals()
+        expected, stored = expected_totals(), stored_totals()
+        mismatched = [
+            user_id for user_id in expected.keys() | stored.keys()
+            if expected.get(user_id, {}) != stored.get(user_id, {})
+        ]
+        if mismatched:
+            raise CommandError(
+                f'Расхождения в списках покупок пользователей: '
+                f'{sorted(mismatched)}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Списки покупок согласованы: {len(expected)} пользователей'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import reconcile_counters
+from recipes.models import Favorite, Follow, Recipe, ShoppingCart
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Исправляет расхождения денормализованных счётчиков.'
+
+    def handle(self, *args, **options):
+        fixed = reconcile_counters(
+            Recipe, User, Favorite, ShoppingCart, Follow
+        )
+        for counter, rows in fixed.items():
+            self.stdout.write(f'{counter}: исправлено строк {rows}')
+        self.stdout.write(self.style.SUCCESS('Счётчики согласованы'))
@@ -1,8 +1,13 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import RowNumber
 from django.core.validators import RegexValidator, MinValueValidator
 
 from users.models import User
 from .constants import REGEX, MIN_NUMBER
+from .counters import CounterFieldsMixin
+from .storage import content_storage, recipe_image_path
 
 
 class Tag(models.Model):
@@ -32,13 +37,89 @@ class Ingredient(models.Model):
         ordering = ('name',)
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient'
+            )
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+    """Кверисет рецептов с пакетной загрузкой связанных данных."""
+
+    def with_related(self, user):
+        """
+        Подгружает автора, тэги и ингредиенты фиксированным числом
+        запросов и аннотирует флаги избранного, корзины и подписки
+        для текущего пользователя.
+        """
+        queryset = self.defer('search_vector').prefetch_related(
+            'tags',
+            models.Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            ),
+        )
+        if not user.is_authenticated:
+            return queryset.select_related('author')
+        return queryset.annotate(
+            is_favorited=models.Exists(Favorite.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+            is_in_shopping_cart=models.Exists(ShoppingCart.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+        ).prefetch_related(models.Prefetch(
+            'author',
+            queryset=User.objects.annotate(is_subscribed=models.Exists(
+                Follow.objects.filter(
+                    user=user, following=models.OuterRef('pk')
+                )
+            ))
+        ))
+
+    def latest_per_author(self, author_ids, limit=None):
+        """
+        Последние limit рецептов каждого автора одним запросом.
+
+        Рецепты нумеруются оконной функцией ROW_NUMBER() в разрезе автора.
+        """
+        queryset = self.filter(author_id__in=author_ids)
+        if limit is not None:
+            ranked = queryset.annotate(recipe_rank=Window(
+                expression=RowNumber(),
+                partition_by=[models.F('author_id')],
+                order_by=models.F('id').desc(),
+            )).values('id', 'recipe_rank')
+            sql, params = ranked.query.sql_with_params()
+            queryset = self.filter(id__in=RawSQL(
+                f'SELECT id FROM ({sql}) AS ranked WHERE recipe_rank <= %s',
+                (*params, limit)
+            ))
+        return queryset.order_by('author_id', '-id')
+
+
+class TimestampedModel(models.Model):
+    """Время создания и последнего изменения записи."""
+    created_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name='Создано'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name='Изменено'
+    )
+
+    class Meta:
+        abstract = True
+
+
+class Recipe(CounterFieldsMixin, TimestampedModel):
     """Модель рецепта."""
+    counter_fields = ('favorites_count', 'in_carts_count')
+
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='recipes'
     )
@@ -49,16 +130,32 @@ class Recipe(models.Model):
     tags = models.ManyToManyField(
         Tag, related_name='recipes'
     )
-    image = models.ImageField(upload_to='image/')
+    image = models.ImageField(
+        upload_to=recipe_image_path, storage=content_storage
+    )
     name = models.CharField(max_length=200)
     text = models.TextField()
     cooking_time = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(MIN_NUMBER)]
     )
+    search_vector = SearchVectorField(null=True, editable=False)
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='В списках покупок'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=('author', '-id'), name='recipe_author_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -93,7 +190,7 @@ class Follow(models.Model):
         ]
 
 
-class Favorite(models.Model):
+class Favorite(TimestampedModel):
     """Модель избранного."""
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              related_name='favorite')
@@ -105,7 +202,7 @@ class Favorite(models.Model):
         unique_together = ('user', 'recipe')
 
 
-class ShoppingCart(models.Model):
+class ShoppingCart(TimestampedModel):
     """Модель списка покупок."""
     user = models.ForeignKey(User, on_delete=models.CASCADE,
                              related_name='shopping_cart')
@@ -115,3 +212,22 @@ class ShoppingCart(models.Model):
     class Meta:
         verbose_name = 'Список покупок'
         unique_together = ('user', 'recipe')
+
+
+class ShoppingListItem(models.Model):
+    """Суммарное количество ингредиента в списке покупок пользователя."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='shopping_list')
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE,
+                                   related_name='shopping_list_items')
+    total_amount = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Ингредиент списка покупок'
+        verbose_name_plural = 'Ингредиенты списка покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_list_item'
+            )
+        ]
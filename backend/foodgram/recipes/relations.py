@@ -0,0 +1,71 @@
+"""
+Избранное, корзина и подписки пользователя: идемпотентное добавление
+и удаление сразу нескольких объектов.
+
+Вставка идёт одним INSERT ... ON CONFLICT DO NOTHING, удаление — одним
+DELETE, и оба возвращают строки, которые действительно изменились.
+Поэтому повторные и параллельные запросы не приводят к ошибкам
+целостности, а счётчики и списки покупок меняются ровно на эти строки.
+Сигналы при этом не срабатывают.
+"""
+from django.db import connection, transaction
+
+from users.models import User
+from .catalog import bump_viewer_version
+from .counters import change_counters
+from .models import Favorite, Follow, Recipe, ShoppingCart
+from .shopping_list import apply_delta, recipe_amounts
+from .utils import delete_returning, insert_returning
+
+
+def sync_favorites(user_id, recipe_ids, sign):
+    change_counters(Recipe, recipe_ids, 'favorites_count', sign)
+
+
+def sync_shopping_cart(user_id, recipe_ids, sign):
+    change_counters(Recipe, recipe_ids, 'in_carts_count', sign)
+    apply_delta([user_id], {
+        ingredient_id: sign * amount
+        for ingredient_id, amount in recipe_amounts(*recipe_ids).items()
+    })
+
+
+def sync_follows(user_id, author_ids, sign):
+    change_counters(User, author_ids, 'followers_count', sign)
+
+
+RELATIONS = {
+    Favorite: ('recipe_id', sync_favorites),
+    ShoppingCart: ('recipe_id', sync_shopping_cart),
+    Follow: ('following_id', sync_follows),
+}
+
+
+@transaction.atomic
+def add_relations(model, user_id, target_ids):
+    """Добавляет отсутствующие связи пользователя с target_ids."""
+    field, sync = RELATIONS[model]
+    added = insert_returning(
+        model,
+        [model(user_id=user_id, **{field: target_id})
+         for target_id in target_ids],
+        field, connection
+    )
+    if added:
+        sync(user_id, added, 1)
+        bump_viewer_version(user_id)
+
+
+@transaction.atomic
+def remove_relations(model, user_id, target_ids):
+    """Удаляет связи пользователя с target_ids, если они есть."""
+    field, sync = RELATIONS[model]
+    removed = delete_returning(
+        model.objects.filter(
+            user_id=user_id, **{f'{field}__in': target_ids}
+        ),
+        field, connection
+    )
+    if removed:
+        sync(user_id, removed, -1)
+        bump_viewer_version(user_id)
@@ -0,0 +1,113 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+
+from .models import RecipeIngredient, ShoppingCart, ShoppingListItem
+
+
+def recipe_amounts(*recipe_ids):
+    """Количество каждого ингредиента в рецептах вместе."""
+    amounts = Counter()
+    for ingredient_id, amount in RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).values_list('ingredient_id', 'amount'):
+        amounts[ingredient_id] += amount
+    return amounts
+
+
+@transaction.atomic
+def apply_delta(user_ids, deltas):
+    """
+    Изменяет суммы ингредиентов в списках покупок пользователей
+    на величины deltas и удаляет обнулившиеся позиции.
+    """
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not user_ids or not deltas:
+        return
+    ShoppingListItem.objects.bulk_create(
+        [ShoppingListItem(user_id=user_id, ingredient_id=ingredient_id)
+         for user_id in user_ids
+         for ingredient_id, delta in deltas.items() if delta > 0],
+        ignore_conflicts=True
+    )
+    items = ShoppingListItem.objects.filter(
+        user_id__in=user_ids, ingredient_id__in=deltas
+    )
+    items.update(total_amount=F('total_amount') + Case(
+        *(When(ingredient_id=ingredient_id, then=Value(delta))
+          for ingredient_id, delta in deltas.items()),
+        default=Value(0)
+    ))
+    items.filter(total_amount__lte=0).delete()
+
+
+def add_to_shopping_list(user_id, recipe_id):
+    apply_delta([user_id], recipe_amounts(recipe_id))
+
+
+def remove_from_shopping_list(user_id, recipe_id):
+    amounts = recipe_amounts(recipe_id)
+    apply_delta([user_id], {key: -value for key, value in amounts.items()})
+
+
+def update_recipe_in_shopping_lists(recipe_id, old_amounts):
+    """Переносит изменение ингредиентов рецепта в списки покупок."""
+    new_amounts = recipe_amounts(recipe_id)
+    deltas = {
+        ingredient_id: (new_amounts.get(ingredient_id, 0)
+                        - old_amounts.get(ingredient_id, 0))
+        for ingredient_id in new_amounts.keys() | old_amounts.keys()
+    }
+    user_ids = list(ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+    apply_delta(user_ids, deltas)
+
+
+def expected_totals(user_ids=None):
+    """Суммы ингредиентов, посчитанные заново по корзинам."""
+    if user_ids is None:
+        cart_filter = {'recipe__in_shopping_cart__isnull': False}
+    else:
+        cart_filter = {'recipe__in_shopping_cart__user__in': user_ids}
+    # Одно условие на корзину, чтобы не создавать второй JOIN
+    # и не умножать суммы на число корзин с рецептом.
+    queryset = RecipeIngredient.objects.filter(**cart_filter)
+    totals = defaultdict(dict)
+    for user_id, ingredient_id, amount in queryset.values_list(
+        'recipe__in_shopping_cart__user', 'ingredient'
+    ).annotate(amount_sum=Sum('amount')).order_by().iterator():
+        totals[user_id][ingredient_id] = amount
+    return totals
+
+
+def stored_totals(user_ids=None):
+    queryset = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    totals = defaultdict(dict)
+    for user_id, ingredient_id, amount in queryset.values_list(
+        'user_id', 'ingredient_id', 'total_amount'
+    ).iterator():
+        totals[user_id][ingredient_id] = amount
+    return totals
+
+
+@transaction.atomic
+def rebuild_totals(batch_size=1000, user_ids=None):
+    """
+    Пересчитывает с нуля суммы списков покупок пользователей user_ids
+    или, если они не заданы, всю таблицу.
+    """
+    items = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        items = items.filter(user_id__in=user_ids)
+    items.delete()
+    ShoppingListItem.objects.bulk_create(
+        (ShoppingListItem(user_id=user_id, ingredient_id=ingredient_id,
+                          total_amount=amount)
+         for user_id, amounts in expected_totals(user_ids).items()
+         for ingredient_id, amount in amounts.items()),
+        batch_size=batch_size
+    )
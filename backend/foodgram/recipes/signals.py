@@ -0,0 +1,176 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from users.models import User
+from .catalog import (bump_author_version, bump_catalog_version,
+                      bump_recipes_version, bump_viewer_version)
+from .counters import change_counter
+from .index import ingredient_index
+from .models import (Favorite, Follow, Ingredient, Recipe, RecipeIngredient,
+                     ShoppingCart, Tag)
+from .shopping_list import add_to_shopping_list, remove_from_shopping_list
+from .tasks import process_recipe_image
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_catalog(sender, **kwargs):
+    bump_catalog_version()
+    bump_recipes_version()
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipes(sender, **kwargs):
+    bump_recipes_version()
+
+
+def touch_recipes(recipe_ids):
+    """
+    Обновляет updated_at рецептов: по нему сверяются фрагменты
+    в кэше RecipeFragmentListSerializer.
+    """
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def touch_recipe_of_ingredient(sender, instance, **kwargs):
+    touch_recipes([instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_tagged_recipes(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            touch_recipes([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        touch_recipes(pk_set)
+    elif action == 'pre_clear':
+        touch_recipes(instance.recipes.values('pk'))
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+@receiver((post_save, post_delete), sender=ShoppingCart)
+@receiver((post_save, post_delete), sender=Follow)
+def invalidate_viewer(sender, instance, **kwargs):
+    bump_viewer_version(instance.user_id)
+
+
+# Поля автора, которые выводятся в ответах с рецептами.
+AUTHOR_FIELDS = ('email', 'username', 'first_name', 'last_name')
+
+
+def author_values(user):
+    return tuple(user.__dict__.get(field) for field in AUTHOR_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_author_values(sender, instance, **kwargs):
+    instance._saved_author_values = author_values(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_recipes(sender, instance, created, update_fields=None,
+                              **kwargs):
+    values = author_values(instance)
+    changed = values != instance._saved_author_values
+    instance._saved_author_values = values
+    if created or not changed or (
+        update_fields and not set(update_fields) & set(AUTHOR_FIELDS)
+    ):
+        return
+    if Recipe.objects.filter(author_id=instance.pk).exists():
+        bump_author_version(instance.pk)
+        bump_recipes_version()
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_recipe_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        add_to_shopping_list(instance.user_id, instance.recipe_id)
+        change_counter(Recipe, instance.recipe_id, 'in_carts_count', 1)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_recipe_from_shopping_list(sender, instance, **kwargs):
+    remove_from_shopping_list(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def decrement_in_carts_count(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'in_carts_count', -1)
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_followers_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.following_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_followers_count(sender, instance, **kwargs):
+    change_counter(User, instance.following_id, 'followers_count', -1)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        change_counter(User, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+def image_name(recipe):
+    """Имя файла изображения, если поле загружено из базы или задано."""
+    image = recipe.__dict__.get('image')
+    return getattr(image, 'name', image)
+
+
+@receiver(post_init, sender=Recipe)
+def remember_recipe_image(sender, instance, **kwargs):
+    instance._saved_image_name = image_name(instance)
+
+
+@receiver(pre_save, sender=Recipe)
+def load_deferred_recipe_image(sender, instance, update_fields=None,
+                               **kwargs):
+    # Отложенное поле, которое не меняли, сохранение всё равно загрузит
+    # из базы; запоминаем его имя, чтобы не считать изображение новым.
+    if 'image' not in instance.__dict__ and (
+        update_fields is None or 'image' in update_fields
+    ):
+        instance._saved_image_name = instance.image.name
+
+
+@receiver(post_save, sender=Recipe)
+def process_new_recipe_image(sender, instance, created, **kwargs):
+    name = image_name(instance)
+    if name and (created or name != instance._saved_image_name):
+        enqueue(process_recipe_image, name=name)
+    instance._saved_image_name = name
@@ -0,0 +1,50 @@
+"""Хранение изображений рецептов под хешем содержимого."""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(file):
+    """SHA-256 содержимого файла; позиция чтения возвращается в начало."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+# Загруженные файлы лежат здесь, пока фоновая задача не сохранит
+# их нормализованную копию.
+UPLOADS_DIR = 'image/uploads'
+
+
+def image_path(file, extension, directory='image'):
+    """<каталог>/<2 символа хеша>/<хеш><расширение>"""
+    digest = content_hash(file)
+    return f'{directory}/{digest[:2]}/{digest}{extension}'
+
+
+def recipe_image_path(instance, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return image_path(instance.image.file, extension, UPLOADS_DIR)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище без переименования: одинаковое имя означает
+    одинаковое содержимое, поэтому повторная загрузка не создаёт копию.
+    """
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+content_storage = ContentAddressedStorage()
@@ -0,0 +1,24 @@
+from django.utils import timezone
+
+from jobs.queue import task
+from .catalog import bump_recipes_version
+from .images import build_variants, is_upload, save_normalized
+from .models import Recipe
+
+
+@task
+def process_recipe_image(name):
+    """
+    Заменяет загруженное изображение нормализованной копией
+    и создаёт уменьшенные копии.
+    """
+    recipes = Recipe.objects.filter(image=name)
+    if not recipes.exists():
+        return
+    if is_upload(name):
+        normalized = save_normalized(name)
+        # Обновление в обход save(): сигналы снова поставили бы задачу.
+        if recipes.update(image=normalized, updated_at=timezone.now()):
+            bump_recipes_version()
+        name = normalized
+    build_variants(name)
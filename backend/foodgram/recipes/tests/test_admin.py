@@ -0,0 +1,128 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.shopping_list import expected_totals, stored_totals
+from users.models import User
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AdminChangelistQueriesTest(TestCase):
+    """Число запросов списков админки не растёт вместе с числом строк."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin',
+            first_name='Админ', last_name='Админов', password='password'
+        )
+        cls.tag = Tag.objects.create(name='Обед', color='#00ff00',
+                                     slug='lunch')
+        cls.ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {index}',
+                                      measurement_unit='г')
+            for index in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        for index in range(start, start + count):
+            author = User.objects.create_user(
+                email=f'user{index}@example.com', username=f'user{index}',
+                first_name='Имя', last_name='Фамилия', password='password'
+            )
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {index}', text='Текст',
+                cooking_time=10, image='image/recipe.jpg'
+            )
+            recipe.tags.add(self.tag)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=10)
+                for ingredient in self.ingredients[:3]
+            )
+
+    def assert_changelist_queries(self, url, queries):
+        for count in (2, 10):
+            self.add_rows(count)
+            with self.subTest(rows=count), self.assertNumQueries(queries):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_recipe_changelist(self):
+        self.assert_changelist_queries(
+            reverse('admin:recipes_recipe_changelist'), 6
+        )
+
+    def test_ingredient_changelist(self):
+        self.assert_changelist_queries(
+            reverse('admin:recipes_ingredient_changelist'), 5
+        )
+
+    def test_user_changelist(self):
+        self.assert_changelist_queries(
+            reverse('admin:users_user_changelist'), 4
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AdminRecipeShoppingListTest(TestCase):
+    """Правка ингредиентов в админке отражается в списках покупок."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@example.com', username='admin',
+            first_name='Админ', last_name='Админов', password='password'
+        )
+        cls.tag = Tag.objects.create(name='Обед', color='#00ff00',
+                                     slug='lunch')
+        cls.flour, cls.sugar = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('Мука', 'Сахар')
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.admin, name='Пирог', text='Текст', cooking_time=10,
+            image='image/recipe.jpg'
+        )
+        cls.recipe.tags.add(cls.tag)
+        cls.row = RecipeIngredient.objects.create(
+            recipe=cls.recipe, ingredient=cls.flour, amount=100
+        )
+        ShoppingCart.objects.create(user=cls.admin, recipe=cls.recipe)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_inline_changes_reach_shopping_list(self):
+        prefix = 'recipeingredient_set'
+        response = self.client.post(
+            reverse('admin:recipes_recipe_change', args=(self.recipe.id,)),
+            {
+                'author': self.admin.id, 'tags': [self.tag.id],
+                'name': 'Пирог', 'text': 'Текст', 'cooking_time': 10,
+                f'{prefix}-TOTAL_FORMS': 2, f'{prefix}-INITIAL_FORMS': 1,
+                f'{prefix}-MIN_NUM_FORMS': 1,
+                f'{prefix}-MAX_NUM_FORMS': 1000,
+                f'{prefix}-0-id': self.row.id,
+                f'{prefix}-0-recipe': self.recipe.id,
+                f'{prefix}-0-ingredient': self.flour.id,
+                f'{prefix}-0-amount': 150,
+                f'{prefix}-1-recipe': self.recipe.id,
+                f'{prefix}-1-ingredient': self.sugar.id,
+                f'{prefix}-1-amount': 5,
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(stored_totals(), expected_totals())
+        self.assertEqual(stored_totals()[self.admin.id],
+                         {self.flour.id: 150, self.sugar.id: 5})
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from recipes.catalog import get_catalog_version, get_recipes_version
+from recipes.models import Ingredient, Tag
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CatalogVersionTest(TestCase):
+    """Версии справочников и рецептов меняются только после фиксации."""
+    def setUp(self):
+        cache.clear()
+
+    def test_versions_change_on_commit(self):
+        catalog, recipes = get_catalog_version(), get_recipes_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='Мука', measurement_unit='г')
+            self.assertEqual(get_catalog_version(), catalog)
+            self.assertEqual(get_recipes_version(), recipes)
+        self.assertNotEqual(get_catalog_version(), catalog)
+        self.assertNotEqual(get_recipes_version(), recipes)
+
+    def test_tag_change_bumps_catalog(self):
+        catalog = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Обед', color='#00ff00', slug='lunch')
+        self.assertNotEqual(get_catalog_version(), catalog)
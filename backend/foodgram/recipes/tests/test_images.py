@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from recipes.images import variant_names
+from recipes.models import Recipe
+from recipes.storage import UPLOADS_DIR, content_storage
+from users.models import User
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+def image_file(name, image_format, size=(2400, 1200)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, image_format)
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, JOBS_RUN_INLINE=True)
+class RecipeImageJobTest(TestCase):
+    """Загруженное изображение обрабатывает фоновая задача."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Имя', last_name='Фамилия', password='password'
+        )
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_recipe(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=self.author, name='Рецепт', text='Текст',
+                cooking_time=10, image=image
+            )
+
+    def test_upload_is_replaced_by_normalized_copy(self):
+        recipe = self.create_recipe(image_file('photo.png', 'PNG'))
+        upload = recipe.image.name
+        self.assertTrue(upload.startswith(f'{UPLOADS_DIR}/'))
+        recipe.refresh_from_db()
+        name = recipe.image.name
+        self.assertFalse(name.startswith(f'{UPLOADS_DIR}/'))
+        self.assertTrue(name.endswith('.jpg'))
+        with content_storage.open(name) as file, Image.open(file) as image:
+            self.assertEqual(image.format, 'JPEG')
+            self.assertEqual(image.size, (1920, 960))
+        for path in variant_names(name):
+            self.assertTrue(content_storage.exists(path), path)
+
+
+class VariantNameTest(TestCase):
+    """Имена копий различаются для разных оригиналов."""
+    def test_same_stem_different_extension(self):
+        self.assertTrue(
+            set(variant_names('image/temp.jpg')).isdisjoint(
+                variant_names('image/temp.png')
+            )
+        )
+
+    def test_same_basename_different_directory(self):
+        self.assertTrue(
+            set(variant_names('image/ab/temp.jpg')).isdisjoint(
+                variant_names('image/cd/temp.jpg')
+            )
+        )
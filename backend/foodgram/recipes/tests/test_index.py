@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from recipes.index import ingredient_index
+from recipes.models import Ingredient
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IngredientIndexTest(TestCase):
+    """Поиск ингредиентов по префиксу в индексе в памяти."""
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Сгущённое молоко', 'молоко', 'Молочный шоколад',
+                     'Мука', 'Кокосовое молоко'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+
+    def names(self, query, limit=None):
+        return [item['name']
+                for item in ingredient_index.search(query, limit=limit)]
+
+    def test_prefix_matches_come_first(self):
+        self.assertEqual(self.names('мол'), [
+            'молоко', 'Молочный шоколад',
+            'Кокосовое молоко', 'Сгущённое молоко',
+        ])
+
+    def test_search_is_case_insensitive(self):
+        self.assertEqual(self.names('МУК'), ['Мука'])
+
+    def test_limit(self):
+        self.assertEqual(self.names('мол', limit=1), ['молоко'])
+        self.assertEqual(self.names('мол', limit=3), [
+            'молоко', 'Молочный шоколад', 'Кокосовое молоко',
+        ])
+
+    def test_new_ingredient_is_found(self):
+        self.names('мол')
+        Ingredient.objects.create(name='Молотый перец', measurement_unit='г')
+        self.assertIn('Молотый перец', self.names('мол'))
+
+    def test_api_uses_index(self):
+        response = self.client.get('/api/ingredients/', {'name': 'мол'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['name'] for item in response.json()][:2],
+            ['молоко', 'Молочный шоколад']
+        )
@@ -0,0 +1,101 @@
+import csv
+import io
+from itertools import islice
+
+COPY_NULL = r'\N'
+
+
+def batches(rows, size):
+    """Разбивает поток строк на списки не длиннее size."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_objects(model, objs, connection):
+    """
+    Вставляет объекты модели через COPY FROM STDIN (только Postgres).
+
+    Если у объектов не задан первичный ключ, его заполнит база.
+    Поля auto_now и auto_now_add заполняются, как в bulk_create.
+    """
+    if not objs:
+        return
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and objs[0].pk is None)
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objs:
+        values = (
+            field.get_db_prep_save(field.pre_save(obj, True), connection)
+            for field in fields
+        )
+        writer.writerow([
+            COPY_NULL if value is None else value for value in values
+        ])
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+            f'({columns}) FROM STDIN '
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')", buffer
+        )
+
+
+def insert_returning(model, objs, field, connection):
+    """
+    Вставляет объекты одним INSERT ... ON CONFLICT DO NOTHING и
+    возвращает значения field у действительно вставленных строк
+    (Postgres и SQLite 3.35+). Сигналы не отправляются.
+    """
+    if not objs:
+        return []
+    quote = connection.ops.quote_name
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    row = '({})'.format(', '.join(['%s'] * len(fields)))
+    params = [
+        field.get_db_prep_save(field.pre_save(obj, True), connection)
+        for obj in objs
+        for field in fields
+    ]
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(model._meta.db_table)} ({columns}) '
+            f'VALUES {", ".join([row] * len(objs))} '
+            f'ON CONFLICT DO NOTHING '
+            f'RETURNING {quote(model._meta.get_field(field).column)}',
+            params
+        )
+        return [value for value, in cursor.fetchall()]
+
+
+def delete_returning(queryset, field, connection):
+    """
+    Удаляет строки queryset одним DELETE ... RETURNING и возвращает
+    значения field у действительно удалённых строк (Postgres
+    и SQLite 3.35+). Сигналы не отправляются.
+    """
+    model = queryset.model
+    quote = connection.ops.quote_name
+    pk_column = quote(model._meta.pk.column)
+    subquery, params = queryset.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {pk_column} IN ({subquery}) '
+            f'RETURNING {quote(model._meta.get_field(field).column)}',
+            params
+        )
+        return [value for value, in cursor.fetchall()]
@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import SAFE_METHODS
+
+TOKEN_CACHE_PREFIX = 'users:token:'
+FORGOTTEN = 'forgotten'
+
+
+def token_cache_key(key):
+    """Ключ кэша по хешу токена, чтобы не хранить сам токен в кэше."""
+    return TOKEN_CACHE_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_token(key):
+    """
+    Вместо удаления записи оставляет метку: запрос, который прочитал
+    токен из базы до выхода, не сможет положить в кэш устаревшую пару.
+    """
+    cache.set(
+        token_cache_key(key), FORGOTTEN, settings.AUTH_TOKEN_CACHE_TIMEOUT
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Аутентификация по токену с кэшированием пары (пользователь, токен).
+
+    Записи живут AUTH_TOKEN_CACHE_TIMEOUT секунд и сбрасываются сигналами
+    при выходе, удалении токена и сохранении пользователя (смена пароля,
+    деактивация). Сброшенный токен не кэшируется, пока действует метка.
+    С общим бэкендом кэша (CACHE_BACKEND) кэш и его сброс действуют сразу
+    во всех процессах.
+
+    Кэш используется только для безопасных методов. Запросы на запись
+    получают пользователя из базы: вьюхи (например, djoser) сохраняют
+    request.user, и устаревший экземпляр затёр бы свежие данные.
+    """
+    use_cache = True
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        if not self.use_cache:
+            return super().authenticate_credentials(key)
+        cache_key = token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is None or credentials == FORGOTTEN:
+            credentials = super().authenticate_credentials(key)
+            # add не перезапишет метку forget_token, поставленную
+            # после чтения токена из базы.
+            cache.add(
+                cache_key, credentials, settings.AUTH_TOKEN_CACHE_TIMEOUT
+            )
+        user, token = credentials
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        return credentials
@@ -3,10 +3,13 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 
 from recipes.constants import REGEX
+from recipes.counters import CounterFieldsMixin
 
 
-class User(AbstractUser):
+class User(CounterFieldsMixin, AbstractUser):
     """Модель пользователя."""
+    counter_fields = ('recipes_count', 'followers_count')
+
     username = models.CharField(
         max_length=150,
         unique=True,
@@ -21,6 +24,12 @@ class User(AbstractUser):
                                  verbose_name='Фамилия')
     password = models.CharField(max_length=150,
                                 verbose_name='Пароль')
+    recipes_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество рецептов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество подписчиков'
+    )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = (
         'username', 'first_name', 'last_name', 'password'
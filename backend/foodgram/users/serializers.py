@@ -3,9 +3,10 @@ import re
 from rest_framework import serializers
 from djoser.serializers import UserCreateSerializer
 
-from recipes.models import Follow
+from foodgram.metrics import TimedSerializerMixin
 from recipes.constants import REGEX
 from .models import User
+from .viewer import get_viewer_state
 
 
 class UsersViewSerializer(serializers.ModelSerializer):
@@ -67,7 +68,8 @@ class UserSerializer(UserCreateSerializer):
         return UsersViewSerializer(instance, context=self.context).data
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для джосера с возвратом информации о подписке."""
     is_subscribed = serializers.SerializerMethodField()
 
@@ -81,7 +83,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return Follow.objects.filter(
-                user=request.user, following=obj
-            ).exists()
+            if hasattr(obj, 'is_subscribed'):
+                return obj.is_subscribed
+            return obj.id in get_viewer_state(request).following_ids
         return False
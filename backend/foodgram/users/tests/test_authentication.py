@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from users.authentication import token_cache_key
+from users.models import User
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+ME_URL = '/api/users/me/'
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedTokenAuthenticationTest(APITestCase):
+    """Кэш токенов сбрасывается при выходе, смене пароля и деактивации."""
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='user@example.com', username='user', first_name='Имя',
+            last_name='Фамилия', password='password'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_safe_requests_use_cache(self):
+        self.assertEqual(self.client.get(ME_URL).status_code, 200)
+        self.assertIsInstance(cache.get(token_cache_key(self.token.key)),
+                              tuple)
+        # Единственный запрос — сами тэги, без чтения токена.
+        with self.assertNumQueries(1):
+            self.client.get('/api/tags/')
+
+    def test_logout(self):
+        self.client.get(ME_URL)
+        response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+    def test_password_change(self):
+        self.client.get(ME_URL)
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': 'password', 'new_password': 'Pa55word!x'
+        })
+        self.assertEqual(response.status_code, 204)
+        self.assertNotIsInstance(
+            cache.get(token_cache_key(self.token.key)), tuple
+        )
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('Pa55word!x'))
+
+    def test_deactivation(self):
+        self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(ME_URL).status_code, 401)
+
+    def test_write_requests_get_fresh_user(self):
+        self.client.get(ME_URL)
+        User.objects.filter(pk=self.user.pk).update(first_name='Новое')
+        self.client.post('/api/users/set_password/', {
+            'current_password': 'password', 'new_password': 'Pa55word!x'
+        })
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'Новое')
@@ -0,0 +1,42 @@
+from django.utils.functional import cached_property
+
+from recipes.models import Favorite, Follow, ShoppingCart
+
+
+class ViewerState:
+    """
+    Подписки, избранное и список покупок текущего пользователя.
+
+    Каждый набор id загружается одним запросом при первом обращении
+    и переиспользуется всеми сериализаторами в рамках запроса.
+    """
+    def __init__(self, user):
+        self.user = user
+
+    def _ids(self, queryset, field):
+        if not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(
+            queryset.filter(user=self.user).values_list(field, flat=True)
+        )
+
+    @cached_property
+    def following_ids(self):
+        return self._ids(Follow.objects, 'following_id')
+
+    @cached_property
+    def favorite_ids(self):
+        return self._ids(Favorite.objects, 'recipe_id')
+
+    @cached_property
+    def shopping_cart_ids(self):
+        return self._ids(ShoppingCart.objects, 'recipe_id')
+
+
+def get_viewer_state(request):
+    """Возвращает состояние пользователя, привязанное к запросу."""
+    state = getattr(request, 'viewer_state', None)
+    if state is None or state.user != request.user:
+        state = ViewerState(request.user)
+        request.viewer_state = state
+    return state